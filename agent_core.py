@@ -2,6 +2,7 @@
 
 import json
 import os
+import random
 import time
 import threading
 from datetime import datetime
@@ -9,8 +10,16 @@ import requests
 import ctypes
 import statistics
 
-from pynput import keyboard, mouse
-import psutil
+try:
+    from pynput import keyboard, mouse
+except ImportError:  # benchmarks / non-desktop envs; worker_loop ko chahiye
+    keyboard = None
+    mouse = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
 try:
     import win32gui
@@ -22,6 +31,11 @@ except ImportError:
 CONFIG_PATH = "config.json"
 DEFAULT_BASE_URL = "https://nagster.onrender.com"
 
+# Backend 429/503/unreachable: isse zyada der ka backoff nahi
+MAX_BACKOFF_SECONDS = 300
+# Coalesced payload me app_usage / suspicious lists ki max length
+MAX_COALESCED_ITEMS = 500
+
 # Simple keys jo spam ke liye use hote hain
 SIMPLE_KEYS = {
     "Key.space",
@@ -147,6 +161,12 @@ class NagsterAgent:
         self.backend_status = "Not checked"
         self.running = False
 
+        # Backend ne 429/503 diya ya reachable nahi: intervals drop nahi hote,
+        # pending_payload me jud-te rehte hain aur retry_at ke baad ek saath jaate hain
+        self.pending_payload = None
+        self.retry_at = 0
+        self.backoff_seconds = 0
+
         # Keyboard tracking
         self.last_key = None
         self.same_key_streak = 0
@@ -344,7 +364,7 @@ class NagsterAgent:
     # -------- Window / activity tracking --------
 
     def get_active_window(self):
-        if not win32gui or not win32process:
+        if not win32gui or not win32process or not psutil:
             return None, None, None
 
         try:
@@ -478,7 +498,7 @@ class NagsterAgent:
             self.running = False
 
         try:
-            self.send_to_backend()  # Send final update
+            self.send_to_backend(force=True)  # Send final update (backoff ho tab bhi)
         except Exception as e:
             print("[Nagster] Final send during logout failed:", e)
 
@@ -645,8 +665,20 @@ class NagsterAgent:
         if len(self.realtime_buffer) > 20:
             self.realtime_buffer = self.realtime_buffer[-20:]
 
-    def send_to_backend(self):
+    def send_to_backend(self, force: bool = False):
         payload = self.build_payload()
+        # UI (Stop) aur worker thread dono yahan aa sakte hain: pending/backoff
+        # state sirf lock ke andar; network call lock ke bahar
+        with self.lock:
+            if self.pending_payload is not None:
+                payload = self._coalesce(self.pending_payload, payload)
+                self.pending_payload = None
+
+            if not force and time.time() < self.retry_at:
+                # backoff chal raha hai: ye interval agle attempt ke saath jayega
+                self.pending_payload = payload
+                return
+
         backend_url = self.config["backend_base_url"].rstrip("/") + "/activity"
 
         try:
@@ -656,8 +688,10 @@ class NagsterAgent:
                 timeout=10,
             )
 
-            if resp.status_code == 200:
+            if resp.status_code in (200, 202):  # 202 = backend ne queue kiya
                 with self.lock:
+                    self.backoff_seconds = 0
+                    self.retry_at = 0
                     self.backend_status = "Connected"
                 
                 # Print activity summary
@@ -679,15 +713,82 @@ class NagsterAgent:
                 self.stop()
                 return
 
+            elif resp.status_code in (429, 503):
+                # rate limit / backend overloaded: Retry-After tak ruko, data rakho
+                self._back_off(payload, resp.headers.get("Retry-After"), f"Busy ({resp.status_code})")
+
             else:
                 with self.lock:
                     self.backend_status = f"Error: {resp.status_code}"
                 print("[Nagster] Backend error:", resp.status_code)
 
+        except requests.RequestException as e:
+            print("[Nagster] Failed to send:", repr(e))
+            self._back_off(payload, None, "Failed: cannot reach backend")
+
         except Exception as e:
             with self.lock:
                 self.backend_status = "Failed: cannot reach backend"
             print("[Nagster] Failed to send:", repr(e))
+
+    def _back_off(self, payload, retry_after: str | None, status: str):
+        """Payload pending rakho, agla attempt Retry-After / exponential backoff ke baad."""
+        with self.lock:
+            if self.pending_payload is not None:
+                # request ke dauraan dusre thread ne naya interval park kiya
+                payload = self._coalesce(payload, self.pending_payload)
+            self.pending_payload = payload
+            self.backoff_seconds = min(
+                max(self.backoff_seconds * 2, self.config["send_interval_seconds"]), MAX_BACKOFF_SECONDS
+            )
+            delay = self.backoff_seconds
+            if retry_after:
+                try:
+                    delay = min(float(retry_after), MAX_BACKOFF_SECONDS)
+                except ValueError:
+                    pass  # HTTP-date format, exponential hi theek
+            # jitter: backend restart ke baad poori fleet ek hi second pe wapas na aaye
+            delay += random.uniform(0, delay / 4)
+            self.retry_at = time.time() + delay
+            self.backend_status = f"{status}, retrying in {int(delay)}s"
+        print(f"[Nagster] {status}; retry in {delay:.0f}s ({payload.get('coalesced_intervals', 1)} intervals pending)")
+
+    def _coalesce(self, older: dict, newer: dict) -> dict:
+        """
+        Do payloads ko ek interval bana do: counters jodo, lists merge karo,
+        latest state (timestamp, current_app, totals) newer se.
+        Pure function; caller self.lock pakde hue hai.
+        """
+        merged = dict(newer)
+        merged["interval_start"] = older["interval_start"]
+        for key in (
+            "active_seconds", "idle_seconds", "keypresses", "mouse_clicks",
+            "mouse_moves", "scrolls", "window_changes", "interval_seconds",
+        ):
+            merged[key] = older[key] + newer[key]
+        merged["suspicious"] = older["suspicious"] or newer["suspicious"]
+        merged["suspicious_activities"] = (
+            older["suspicious_activities"] + newer["suspicious_activities"]
+        )[-MAX_COALESCED_ITEMS:]
+
+        # current app ke har interval wale hisse (duration_seconds) ek entry me,
+        # switch history wale segments (duration + end_time) jaise ke taise
+        app_usage = []
+        current = {}
+        for seg in older["app_usage"] + newer["app_usage"]:
+            if "duration_seconds" in seg:
+                key = (seg["app_exe"], seg["app_title"])
+                if key in current:
+                    current[key]["duration_seconds"] += seg["duration_seconds"]
+                    continue
+                seg = current[key] = dict(seg)
+            app_usage.append(seg)
+        for seg in current.values():
+            seg["percentage"] = min(seg["duration_seconds"] / merged["interval_seconds"] * 100, 100)
+        merged["app_usage"] = app_usage[-MAX_COALESCED_ITEMS:]
+
+        merged["coalesced_intervals"] = older.get("coalesced_intervals", 1) + 1
+        return merged
     
     def _describe_activity(self, payload):
         """Create a human-readable description of the activity"""
@@ -721,6 +822,9 @@ class NagsterAgent:
     # -------- Worker loop --------
 
     def worker_loop(self):
+        if keyboard is None or mouse is None:
+            raise RuntimeError("pynput is required for input tracking (pip install pynput)")
+
         self.running = True
         interval = self.config["send_interval_seconds"]  # 8 seconds
         idle_logout = self.config.get("idle_logout_seconds", 300)
@@ -522,7 +522,7 @@ class CompactNagsterUI:
     def on_stop_click(self):
         try:
             print("[Nagster] Sending final session data...")
-            self.agent.send_to_backend()
+            self.agent.send_to_backend(force=True)  # backoff ho tab bhi, warna stop() pending data gira deta
         except Exception as e:
             print("[Nagster] Final send failed:", repr(e))
         
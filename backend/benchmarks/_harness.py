@@ -0,0 +1,196 @@
+"""
+Shared helpers for the backend benchmarks (temp DB, local uvicorn, latency stats).
+
+`main` module-level config env vars se padhta hai, isliye `import_main()`
+env set karke hi import karta hai: benchmark kabhi real nagster.db ko nahi chhuta.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_main(db_path: str | None = None, **env):
+    """Temp DB (ya diya hua path) ke saath backend `main` import karo."""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="nagster-bench-"), "nagster.db")
+    os.environ["NAGSTER_DB_PATH"] = db_path
+    for key, value in env.items():
+        os.environ[key] = str(value)
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import main
+
+    return main
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def serve(app, log_level: str = "warning"):
+    """App ko background thread me uvicorn pe chalao, base URL yield karo."""
+    import uvicorn
+
+    port = free_port()
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level=log_level)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.time() + 30
+    while not server.started:
+        if time.time() > deadline or not thread.is_alive():
+            raise RuntimeError("uvicorn did not start")
+        time.sleep(0.05)
+
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=30)
+
+
+@contextmanager
+def serve_process(db_path: str, log_level: str = "warning", **env):
+    """
+    `uvicorn main:app` alag process me (load generator ke saath GIL share
+    na kare). SIGTERM pe graceful shutdown: ingest queue drain hoti hai.
+    """
+    import requests
+
+    port = free_port()
+    proc_env = {**os.environ, "NAGSTER_DB_PATH": db_path, **{k: str(v) for k, v in env.items()}}
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", log_level,
+        ],
+        cwd=BACKEND_DIR,
+        env=proc_env,
+    )
+    url = f"http://127.0.0.1:{port}"
+
+    deadline = time.time() + 30
+    while True:
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn process exited during startup")
+        try:
+            requests.get(url + "/health", timeout=1)
+            break
+        except requests.ConnectionError:
+            if time.time() > deadline:
+                proc.kill()
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.1)
+
+    try:
+        yield url
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def db_size_bytes(db_path: str) -> int:
+    """Main DB + WAL file."""
+    return sum(
+        os.path.getsize(db_path + suffix)
+        for suffix in ("", "-wal")
+        if os.path.exists(db_path + suffix)
+    )
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def latency_summary(latencies_ms: list[float]) -> dict:
+    values = sorted(latencies_ms)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(values[-1], 2) if values else 0.0,
+    }
+
+
+def print_table(rows: list[dict], columns: list[str]):
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).ljust(widths[c]) for c in columns))
+
+
+def seed_basic(main, employees: int, rows_per_employee: int, day: str, batch_size: int = 2000):
+    """
+    Quick fixture: `employees` employees + har ek ke `rows_per_employee`
+    8-second intervals on `day`, normal ingest path (rollups bhi bante hain).
+    """
+    from datetime import datetime, timedelta
+
+    apps = [
+        ("chrome.exe", "Jira - Sprint board - Google Chrome"),
+        ("Code.exe", "main.py - Nagster - Visual Studio Code"),
+        ("slack.exe", "Slack | #engineering"),
+        ("EXCEL.EXE", "Q3 report.xlsx - Excel"),
+    ]
+
+    with main.db_pool.connection() as conn:
+        cur = conn.cursor()
+        cur.executemany(
+            """
+            INSERT OR IGNORE INTO employees (
+                employee_id, name, designation, domain, department,
+                location, work_mode, joining_date, manager_name, status
+            )
+            VALUES (?, ?, 'Engineer', 'Software', ?, 'Pune', 'Hybrid', '2024-01-01', ?, 'Inactive')
+            """,
+            [
+                (f"BENCH{i:05d}", f"Bench Employee {i}", f"Dept{i % 10}", f"Manager{i % 25}")
+                for i in range(employees)
+            ],
+        )
+        conn.commit()
+        main.employee_registry.load(conn)
+
+        start = datetime.fromisoformat(f"{day}T09:00:00")
+        batch = []
+        for i in range(employees):
+            for n in range(rows_per_employee):
+                exe, title = apps[(i + n // 40) % len(apps)]
+                batch.append(
+                    main.ActivityLog(
+                        employee_id=f"BENCH{i:05d}",
+                        timestamp=start + timedelta(seconds=8 * n),
+                        active_seconds=6 if n % 5 else 2,
+                        idle_seconds=2 if n % 5 else 6,
+                        suspicious=(n % 997 == 0),
+                        active_app_exe=exe,
+                        active_app_title=title,
+                    )
+                )
+                if len(batch) >= batch_size:
+                    main.store_activity_logs(conn, batch)
+                    batch = []
+        if batch:
+            main.store_activity_logs(conn, batch)
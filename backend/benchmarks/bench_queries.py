@@ -0,0 +1,152 @@
+"""
+Read-endpoint latency on a big history DB (gen_history.py se bana): har
+dashboard read route ko day / week / poori range pe time karta hai.
+
+    cd backend
+    python benchmarks/gen_history.py --db /tmp/history.db --employees 200 --days 90
+    python benchmarks/bench_queries.py --db /tmp/history.db --repeat 20 --out queries.json
+
+Server `uvicorn main:app` alag process me us DB pe chalta hai, response
+cache band (NAGSTER_RESPONSE_CACHE_MAX_ENTRIES=0), taaki har request asli
+query naape. Pehli request alag se "cold_ms" me (SQLite page cache khaali),
+baaki --repeat requests ke percentiles. DB sirf padha jaata hai; bas
+/analytics/groups dirty dates refresh kar sakta hai.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from datetime import date, timedelta
+
+import requests
+
+from _harness import latency_summary, print_table, serve_process
+
+
+def history_info(db_path: str) -> tuple[str, str, str, str]:
+    """(first date, last date, busiest employee on last date, a department)."""
+    conn = sqlite3.connect(db_path)
+    try:
+        first, last = conn.execute("SELECT MIN(date), MAX(date) FROM daily_activity_rollup").fetchone()
+        if last is None:
+            raise SystemExit(f"{db_path} me activity nahi hai; pehle gen_history.py chalao")
+        employee = conn.execute(
+            """
+            SELECT employee_id FROM daily_activity_rollup
+            WHERE date = ? ORDER BY intervals DESC LIMIT 1
+            """,
+            (last,),
+        ).fetchone()[0]
+        department = conn.execute(
+            "SELECT department FROM employees WHERE employee_id = ?", (employee,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    return first, last, employee, department
+
+
+def cases(first: str, last: str, emp: str, dept: str) -> list[tuple[str, str]]:
+    """(label, path) - har read route, chhoti se badi range tak."""
+    week = (date.fromisoformat(last) - timedelta(days=6)).isoformat()
+    week = max(week, first)
+    full = f"from={first}&to={last}"
+    return [
+        ("overview day", f"/overview?date_str={last}"),
+        ("overview week", f"/overview?from={week}&to={last}"),
+        ("overview range", f"/overview?{full}"),
+        ("overview range breakdown", f"/overview?{full}&breakdown=true"),
+        ("summary day", f"/summary/{emp}?date_str={last}"),
+        ("summary range", f"/summary/{emp}?{full}"),
+        ("summary range breakdown", f"/summary/{emp}?{full}&breakdown=true"),
+        ("activity day (all)", f"/activity/{emp}?date_str={last}"),
+        ("activity day limit=500", f"/activity/{emp}?date_str={last}&limit=500"),
+        ("timeline day 15m", f"/timeline/{emp}?date_str={last}&bucket=15m"),
+        ("timeline day 1h", f"/timeline/{emp}?date_str={last}&bucket=1h"),
+        ("employees", "/employees"),
+        ("employee by id", f"/employees/{emp}"),
+        ("suspicious week", f"/suspicious?from={week}&to={last}"),
+        ("suspicious range dept", f"/suspicious?{full}&department={dept}"),
+        ("top-apps range by department", f"/analytics/top-apps?by=department&{full}"),
+        ("top-apps range by employee", f"/analytics/top-apps?by=employee&{full}"),
+        ("groups range by manager", f"/analytics/groups?by=manager&{full}"),
+        ("groups range by location", f"/analytics/groups?by=location&{full}"),
+        ("export day ndjson", f"/export/activity?from={last}&to={last}"),
+        ("export week dept csv", f"/export/activity?from={week}&to={last}&department={dept}&format=csv"),
+    ]
+
+
+def timed_get(session: requests.Session, url: str) -> tuple[float, int, int]:
+    """(ms till full body, status, body bytes) - streams (export) bhi poore padhe."""
+    start = time.perf_counter()
+    resp = session.get(url, stream=True, timeout=300)
+    size = 0
+    for chunk in resp.iter_content(65536):
+        size += len(chunk)
+    return (time.perf_counter() - start) * 1000, resp.status_code, size
+
+
+def run_case(session, base_url: str, label: str, path: str, repeat: int) -> dict:
+    cold_ms, status, size = timed_get(session, base_url + path)
+    latencies = []
+    errors = 0 if status == 200 else 1
+    for _ in range(repeat):
+        ms, status, size = timed_get(session, base_url + path)
+        latencies.append(ms)
+        if status != 200:
+            errors += 1
+    return {
+        "case": label,
+        "cold_ms": round(cold_ms, 2),
+        **latency_summary(latencies),
+        "bytes": size,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", required=True, help="gen_history.py se bana DB")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--employee", help="default: last day ka sabse busy employee")
+    parser.add_argument("--only", help="sirf wo cases jinke label me ye text ho")
+    parser.add_argument("--out", help="results JSON file me bhi likho")
+    args = parser.parse_args()
+
+    db_path = os.path.abspath(args.db)
+    first, last, emp, dept = history_info(db_path)
+    emp = args.employee or emp
+    selected = [(label, path) for label, path in cases(first, last, emp, dept) if not args.only or args.only in label]
+
+    print(f"History {first} .. {last}, employee {emp}, department {dept}, {args.repeat} runs per case")
+    rows = []
+    with serve_process(db_path, NAGSTER_RESPONSE_CACHE_MAX_ENTRIES=0) as url:
+        session = requests.Session()
+        for label, path in selected:
+            rows.append(run_case(session, url, label, path, args.repeat))
+            print(f"  {label:<32} p50 {rows[-1]['p50_ms']:>9} ms")
+
+    print()
+    print_table(rows, ["case", "cold_ms", "p50_ms", "p95_ms", "max_ms", "bytes", "errors"])
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "db": db_path,
+                    "db_bytes": os.path.getsize(db_path),
+                    "from": first,
+                    "to": last,
+                    "employee": emp,
+                    "repeat": args.repeat,
+                    "results": rows,
+                },
+                f,
+                indent=2,
+            )
+        print("Saved", args.out)
+
+
+if __name__ == "__main__":
+    main()
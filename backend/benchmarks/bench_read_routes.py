@@ -0,0 +1,116 @@
+"""
+Read-route throughput: async handlers (AsyncDB executor) vs the same
+queries behind plain sync `def` routes (Starlette threadpool), under N
+concurrent clients.
+
+    cd backend
+    python benchmarks/bench_read_routes.py --employees 50 --rows 400 --clients 32 --duration 10
+
+Server aur clients ek hi process me chalte hain (GIL share), isliye absolute
+numbers production se kam honge; dono variants ka comparison fair hai.
+"""
+
+import argparse
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import requests
+
+from _harness import import_main, latency_summary, print_table, seed_basic, serve
+
+
+def build_sync_app(main):
+    """Baseline: wahi query functions, sync def routes + Depends(get_db)."""
+    from fastapi import Depends, FastAPI, Query
+
+    app = FastAPI()
+
+    @app.get("/overview")
+    def overview(date_str: str | None = Query(None), conn=Depends(main.get_db)):
+        return main.query_overview(conn, *main.resolve_date_range(date_str, None, None))
+
+    @app.get("/summary/{employee_id}")
+    def summary(employee_id: str, date_str: str | None = Query(None), conn=Depends(main.get_db)):
+        return main.query_summary(conn, employee_id, *main.resolve_date_range(date_str, None, None))
+
+    @app.get("/activity/{employee_id}")
+    def activity(employee_id: str, date_str: str | None = Query(None), conn=Depends(main.get_db)):
+        return main.query_activity_logs(conn, employee_id, date_str)[0]
+
+    @app.get("/employees")
+    def employees(status: str | None = Query(None), conn=Depends(main.get_db)):
+        return main.query_employees(conn, status)[0]
+
+    return app
+
+
+def hammer(base_url: str, paths: list[str], clients: int, duration: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+    counter = itertools.count()
+
+    def client():
+        nonlocal errors
+        session = requests.Session()
+        local, local_errors = [], 0
+        while time.perf_counter() < stop_at:
+            path = paths[next(counter) % len(paths)]
+            t0 = time.perf_counter()
+            resp = session.get(base_url + path, timeout=30)
+            local.append((time.perf_counter() - t0) * 1000)
+            if resp.status_code != 200:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for _ in range(clients):
+            pool.submit(client)
+    elapsed = time.perf_counter() - started
+
+    return {"rps": round(len(latencies) / elapsed, 1), "errors": errors, **latency_summary(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=400, help="intervals per employee")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per variant")
+    args = parser.parse_args()
+
+    # response cache off: sirf async vs sync handler ka fark naapna hai
+    backend = import_main(NAGSTER_RESPONSE_CACHE_MAX_ENTRIES=0)
+    day = date.today().isoformat()
+    paths = [
+        f"/overview?date_str={day}",
+        f"/summary/BENCH00001?date_str={day}",
+        f"/activity/BENCH00002?date_str={day}",
+        "/employees",
+    ]
+
+    results = []
+    with serve(backend.app) as url:
+        print(f"Seeding {args.employees} employees x {args.rows} intervals ...")
+        seed_basic(backend, args.employees, args.rows, day)
+
+        print(f"async routes: {args.clients} clients x {args.duration}s")
+        results.append({"variant": "async (AsyncDB)", **hammer(url, paths, args.clients, args.duration)})
+
+    with serve(build_sync_app(backend)) as url:
+        print(f"sync routes: {args.clients} clients x {args.duration}s")
+        results.append({"variant": "sync def (threadpool)", **hammer(url, paths, args.clients, args.duration)})
+
+    print()
+    print_table(results, ["variant", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms", "errors"])
+
+
+if __name__ == "__main__":
+    main()
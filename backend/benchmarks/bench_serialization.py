@@ -0,0 +1,121 @@
+"""
+Response serialization cost per endpoint: JSON bytes, encode time
+(stdlib json vs orjson) aur gzip size/time, same payloads jo routes banate hain.
+
+    cd backend
+    python benchmarks/bench_serialization.py --employees 500 --rows 1000
+    python benchmarks/bench_serialization.py --out serialization.json
+
+Encode time = `--repeat` runs ka median. gzip level main.GZIP_LEVEL hai
+(wahi jo GZipMiddleware use karta hai).
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import time
+
+from _harness import import_main, print_table, seed_basic
+
+DAY = "2026-01-15"
+
+
+def payloads(main, conn) -> dict:
+    """Route name -> wahi data jo route JSON me bhejta hai."""
+    emp = "BENCH00000"
+    suspicious, _ = main.query_suspicious(conn, DAY, DAY)
+    return {
+        "/overview": main.query_overview(conn, DAY, DAY),
+        "/summary/{id}": main.query_summary(conn, emp, DAY, DAY),
+        "/activity/{id}": main.query_activity_logs(conn, emp, DAY)[0],
+        "/timeline/{id}": main.query_timeline(conn, emp, DAY, "15m"),
+        "/employees": main.query_employees(conn, None)[0],
+        "/suspicious": {"from": DAY, "to": DAY, "count": len(suspicious), "items": suspicious},
+        "/analytics/top-apps": main.query_top_apps(conn, DAY, DAY, "employee", 10),
+        "/analytics/groups": main.query_groups(conn, "manager", DAY, DAY),
+    }
+
+
+def timed_ms(fn, repeat: int) -> tuple[float, object]:
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def measure(name: str, data, repeat: int, level: int) -> dict:
+    stdlib_ms, body = timed_ms(
+        lambda: json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+        repeat,
+    )
+    row = {
+        "endpoint": name,
+        "bytes": len(body),
+        "json_ms": round(stdlib_ms, 3),
+        "orjson_ms": "-",
+        "speedup": "-",
+    }
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+    if orjson is not None:
+        orjson_ms, _ = timed_ms(lambda: orjson.dumps(data), repeat)
+        row["orjson_ms"] = round(orjson_ms, 3)
+        row["speedup"] = f"{stdlib_ms / orjson_ms:.1f}x" if orjson_ms else "-"
+
+    gzip_ms, compressed = timed_ms(lambda: gzip.compress(body, compresslevel=level), repeat)
+    row["gzip_bytes"] = len(compressed)
+    row["ratio"] = f"{len(body) / len(compressed):.1f}x" if compressed else "-"
+    row["gzip_ms"] = round(gzip_ms, 3)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=1000, help="intervals per employee")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", help="results JSON file me bhi likho")
+    args = parser.parse_args()
+
+    backend = import_main()
+    backend.configure_database()
+    with backend.db_pool.connection() as conn:
+        backend.init_db(conn)
+    print(f"Seeding {args.employees} employees x {args.rows} intervals on {DAY} ...")
+    seed_basic(backend, args.employees, args.rows, DAY)
+
+    rows = []
+    with backend.db_pool.connection() as conn:
+        for name, data in payloads(backend, conn).items():
+            rows.append(measure(name, data, args.repeat, backend.GZIP_LEVEL))
+
+    print()
+    print_table(
+        rows,
+        ["endpoint", "bytes", "json_ms", "orjson_ms", "speedup", "gzip_bytes", "ratio", "gzip_ms"],
+    )
+    print(f"\ngzip level {backend.GZIP_LEVEL}, min size {backend.GZIP_MIN_BYTES} bytes")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "employees": args.employees,
+                    "rows_per_employee": args.rows,
+                    "gzip_level": backend.GZIP_LEVEL,
+                    "results": rows,
+                },
+                f,
+                indent=2,
+            )
+        print("Saved", args.out)
+
+
+if __name__ == "__main__":
+    main()
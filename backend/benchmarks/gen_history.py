@@ -0,0 +1,346 @@
+"""
+Synthetic history generator: N employees x D days ka realistic data ek
+SQLite DB me, taaki /overview, /summary, /activity jaise reads ko mahino ke
+data pe naapa ja sake (bench_queries.py isi DB pe chalta hai).
+
+    cd backend
+    python benchmarks/gen_history.py --db /tmp/history.db --employees 200 --days 90
+    python benchmarks/bench_queries.py --db /tmp/history.db
+
+- employees: backend/employees_complex.json ke shape (profile / job /
+  manager) se, flattened `employees` columns me; ~8 log ek manager ke neeche.
+- activity_logs: har workday 8-second intervals, shift start/lunch/end me
+  jitter, active/idle streaks, department ke hisaab se app mix, app switch
+  pe app_usage segments, kuch "risky" employees me zyada suspicious events.
+- bulk inserts (executemany, ek transaction per day), phir saare rollups
+  rebuild + group rollup refresh, jaise `manage.py rebuild-rollups`.
+
+Same --seed -> same data. Existing DB me ye employees ka data pehle se ho
+to abort karta hai (duplicate intervals na banein).
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from _harness import BACKEND_DIR, db_size_bytes, import_main
+
+INTERVAL_SECONDS = 8
+EMPLOYEE_PREFIX = "SYN"
+
+# exe -> titles (title cardinality bhi realistic rahe)
+APP_TITLES = {
+    "chrome.exe": [
+        "Jira - Sprint board - Google Chrome",
+        "Confluence - Team space - Google Chrome",
+        "Gmail - Inbox - Google Chrome",
+        "Stack Overflow - Google Chrome",
+        "YouTube - Google Chrome",
+        "GitHub - Pull requests - Google Chrome",
+    ],
+    "Code.exe": [
+        "main.py - Nagster - Visual Studio Code",
+        "api.ts - portal - Visual Studio Code",
+        "README.md - infra - Visual Studio Code",
+    ],
+    "slack.exe": ["Slack | #engineering", "Slack | #general", "Slack | Direct message"],
+    "Teams.exe": ["Daily standup | Microsoft Teams", "Chat | Microsoft Teams"],
+    "OUTLOOK.EXE": ["Inbox - Outlook", "Calendar - Outlook"],
+    "EXCEL.EXE": ["Q3 report.xlsx - Excel", "Capacity plan.xlsx - Excel"],
+    "WINWORD.EXE": ["Requirements.docx - Word"],
+    "Figma.exe": ["Checkout flow - Figma", "Design system - Figma"],
+    "WindowsTerminal.exe": ["Windows PowerShell", "ssh prod-bastion"],
+    "postman.exe": ["Postman - Orders API"],
+}
+
+# app -> active second me approx keypresses (typing vs reading apps)
+KEYS_PER_ACTIVE_SECOND = {
+    "chrome.exe": 0.6, "Code.exe": 2.6, "slack.exe": 1.8, "Teams.exe": 0.3,
+    "OUTLOOK.EXE": 1.2, "EXCEL.EXE": 1.0, "WINWORD.EXE": 2.2, "Figma.exe": 0.3,
+    "WindowsTerminal.exe": 1.6, "postman.exe": 0.9,
+}
+
+# department profile -> app weights
+APP_MIXES = {
+    "dev": {"Code.exe": 35, "chrome.exe": 25, "slack.exe": 12, "WindowsTerminal.exe": 10,
+            "Teams.exe": 8, "postman.exe": 5, "OUTLOOK.EXE": 5},
+    "design": {"Figma.exe": 40, "chrome.exe": 25, "slack.exe": 15, "Teams.exe": 10, "OUTLOOK.EXE": 10},
+    "qa": {"chrome.exe": 35, "postman.exe": 15, "Code.exe": 10, "EXCEL.EXE": 10, "slack.exe": 15,
+           "Teams.exe": 10, "OUTLOOK.EXE": 5},
+    "business": {"EXCEL.EXE": 25, "OUTLOOK.EXE": 20, "chrome.exe": 20, "Teams.exe": 15,
+                 "WINWORD.EXE": 10, "slack.exe": 10},
+}
+DEPARTMENT_MIX = {
+    "Design": "design", "Quality": "qa", "Product": "business", "Business": "business",
+    "Ops": "business", "Support": "business", "HR": "business", "Finance": "business",
+}
+
+SUSPICIOUS_RATE = 0.0005  # per interval, normal employee
+RISKY_SHARE = 0.05  # itne employees me ~20x suspicious rate
+RISKY_RATE = 0.01
+
+
+def load_templates(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_employees(templates: list[dict], count: int, rng: random.Random) -> list[dict]:
+    """employees_complex.json records -> flat `employees` rows (nested shape wahi)."""
+    first_names = sorted({t["profile"]["name"].split()[0] for t in templates})
+    last_names = sorted({t["profile"]["name"].split()[-1] for t in templates})
+    manager_pool = sorted({(t["manager"]["name"], t["manager"]["email"]) for t in templates})
+
+    # har department me ~8 log ek manager ke neeche
+    team_of: dict[str, int] = {}
+    manager_of: dict[tuple[str, int], tuple[str, str]] = {}
+    rows = []
+    for i in range(count):
+        t = templates[i % len(templates)]
+        profile, job = t["profile"], t["job"]
+        dept = job["department"]
+        team_index = team_of.get(dept, 0)
+        team_of[dept] = team_index + 1
+        team = (dept, team_index // 8)
+        if team not in manager_of:
+            manager_of[team] = rng.choice(manager_pool)
+        mgr_name, mgr_email = manager_of[team]
+        first, last = rng.choice(first_names), rng.choice(last_names)
+        rows.append({
+            "employee_id": f"{EMPLOYEE_PREFIX}{i:05d}",
+            "name": f"{first} {last}",
+            "email": f"{first.lower()}.{last.lower()}{i}@example.com",
+            "phone": profile.get("phone"),
+            "designation": job["designation"],
+            "domain": job["domain"],
+            "department": dept,
+            "location": profile["location"],
+            "work_mode": profile["work_mode"],
+            "employee_type": job.get("employee_type"),
+            "salary_band": job.get("salary_band"),
+            "joining_date": t.get("joining_date"),
+            "manager_name": f"{mgr_name} ({dept})",
+            "manager_email": mgr_email,
+            "status": t.get("status", "Active"),
+        })
+    return rows
+
+
+class EmployeeDay:
+    """Ek employee ka generator state (app mix, habits) - din-ba-din."""
+
+    def __init__(self, row: dict, rng: random.Random):
+        self.employee_id = row["employee_id"]
+        self.rng = rng
+        mix = APP_MIXES[DEPARTMENT_MIX.get(row["department"], "dev")]
+        self.apps = list(mix)
+        self.weights = list(mix.values())
+        self.start_hour = rng.uniform(8.5, 10.5)
+        self.hours = rng.uniform(7.5, 9.5)
+        self.suspicious_rate = RISKY_RATE if rng.random() < RISKY_SHARE else SUSPICIOUS_RATE
+
+    def pick_app(self) -> tuple[str, str]:
+        exe = self.rng.choices(self.apps, self.weights)[0]
+        return exe, self.rng.choice(APP_TITLES[exe])
+
+    def intervals(self, day: date):
+        """(interval end datetime, row values, app_usage segments, suspicious events)."""
+        rng = self.rng
+        if day.weekday() >= 5 and rng.random() > 0.03:
+            return
+        if rng.random() < 0.04:  # chhutti
+            return
+
+        start = datetime.combine(day, datetime.min.time()) + timedelta(
+            hours=self.start_hour + rng.gauss(0, 0.25)
+        )
+        total = int((self.hours + rng.gauss(0, 0.5)) * 3600) // INTERVAL_SECONDS
+        lunch_at = int(total * rng.uniform(0.4, 0.55))
+        lunch_len = int(rng.uniform(30, 60) * 60) // INTERVAL_SECONDS
+
+        app = self.pick_app()
+        app_since = 0
+        active = True
+        for n in range(total):
+            if lunch_at <= n < lunch_at + lunch_len:
+                continue  # lunch pe agent idle-logout, koi interval nahi
+            ts = start + timedelta(seconds=INTERVAL_SECONDS * (n + 1))
+
+            # active/idle streaks (meetings, reading, coffee)
+            if active and rng.random() < 0.03:
+                active = False
+            elif not active and rng.random() < 0.2:
+                active = True
+            active_s = rng.choice((8, 8, 8, 7, 6, 5)) if active else rng.choice((0, 0, 0, 1, 2))
+
+            segments = []
+            window_changes = 0
+            if rng.random() < 1 / 25:  # ~3 min dwell
+                if n > app_since:
+                    prev_exe, prev_title = app
+                    segments.append((prev_exe, prev_title, (n - app_since) * INTERVAL_SECONDS, ts.isoformat()))
+                app = self.pick_app()
+                app_since = n
+                window_changes = 1
+            segments.append((app[0], app[1], min((n - app_since) * INTERVAL_SECONDS, 8), None))
+
+            rate = KEYS_PER_ACTIVE_SECOND[app[0]]
+            keys = int(rng.expovariate(1 / (rate * active_s))) if active_s else 0
+            moves = int(rng.expovariate(1 / (12 * active_s))) if active_s else 0
+            clicks = rng.randint(0, 3) if active_s else 0
+            scrolls = rng.randint(0, 6) if active_s and app[0] == "chrome.exe" else 0
+
+            events = []
+            if rng.random() < self.suspicious_rate:
+                key = rng.choice("aejkl")
+                if rng.random() < 0.7:
+                    events.append((ts.isoformat(), f"Repeated key '{key}' 0 times", key, None))
+                else:
+                    events.append((
+                        ts.isoformat(), "fake_activity_detected", None,
+                        f"Uniform key spam detected (key: {key})",
+                    ))
+
+            yield ts, (active_s, 8 - active_s, keys, clicks, moves, scrolls, window_changes), app, segments, events
+
+
+def has_existing_rows(conn) -> bool:
+    cur = conn.execute(
+        "SELECT 1 FROM activity_logs WHERE employee_id LIKE ? LIMIT 1", (EMPLOYEE_PREFIX + "%",)
+    )
+    return cur.fetchone() is not None
+
+
+def insert_employees(main, conn, rows: list[dict]):
+    cols = list(rows[0])
+    conn.executemany(
+        f"INSERT OR IGNORE INTO employees ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})",
+        [tuple(r[c] for c in cols) for r in rows],
+    )
+    conn.commit()
+    main.employee_registry.load(conn)
+
+
+def resolve_app_ids(main, conn) -> dict:
+    keys = {(exe, title) for exe, titles in APP_TITLES.items() for title in titles}
+    ids, fresh = main.app_dictionary.ids_for(conn.cursor(), keys)
+    conn.commit()
+    main.app_dictionary.remember(fresh)
+    return ids
+
+
+def insert_day(conn, day: date, employees: list[EmployeeDay], app_ids: dict) -> tuple[int, int, int]:
+    """Ek din ke saare employees: bulk insert, ek transaction. (intervals, segments, events)"""
+    day_str = day.isoformat()
+    log_rows, details = [], []
+    for emp in employees:
+        for ts, counters, app, segments, events in emp.intervals(day):
+            active_s, idle_s, keys, clicks, moves, scrolls, changes = counters
+            log_rows.append((
+                emp.employee_id, day_str, ts.isoformat(), active_s, idle_s, 1 if events else 0,
+                app_ids[app], keys, clicks, moves, scrolls, changes,
+            ))
+            details.append((segments, events))
+    if not log_rows:
+        return 0, 0, 0
+
+    cur = conn.cursor()
+    cur.executemany(
+        """
+        INSERT INTO activity_logs (
+            employee_id, date, timestamp,
+            active_seconds, idle_seconds, suspicious, app_id,
+            keypresses, mouse_clicks, mouse_moves, scrolls, window_changes
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        log_rows,
+    )
+    # store_activity_logs wala hi trick: ek transaction me AUTOINCREMENT ids lagatar
+    first_id = cur.execute("SELECT last_insert_rowid()").fetchone()[0] - len(log_rows) + 1
+
+    usage_rows, event_rows = [], []
+    for activity_id, row, (segments, events) in zip(range(first_id, first_id + len(log_rows)), log_rows, details):
+        emp_id = row[0]
+        for exe, title, seconds, end_time in segments:
+            usage_rows.append((activity_id, emp_id, day_str, app_ids[(exe, title)], seconds * 1000, end_time))
+        for ts, reason, key, detail in events:
+            event_rows.append((activity_id, emp_id, day_str, ts, reason, key, detail))
+
+    cur.executemany(
+        """
+        INSERT INTO app_usage (activity_id, employee_id, date, app_id, duration_ms, end_time)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        usage_rows,
+    )
+    if event_rows:
+        cur.executemany(
+            """
+            INSERT INTO suspicious_events (activity_id, employee_id, date, timestamp, reason, key, details)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            event_rows,
+        )
+    conn.commit()
+    return len(log_rows), len(usage_rows), len(event_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", required=True, help="target SQLite file (naya ya existing nagster.db)")
+    parser.add_argument("--employees", type=int, default=100)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--end", help="last day YYYY-MM-DD (default: kal)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--templates",
+        default=os.path.join(BACKEND_DIR, "employees_complex.json"),
+        help="employee shape/value pools",
+    )
+    args = parser.parse_args()
+
+    end = date.fromisoformat(args.end) if args.end else date.today() - timedelta(days=1)
+    days = [end - timedelta(days=d) for d in range(args.days - 1, -1, -1)]
+    rng = random.Random(args.seed)
+
+    backend = import_main(os.path.abspath(args.db))
+    backend.configure_database()
+    with backend.db_pool.connection() as conn:
+        backend.init_db(conn)
+        if has_existing_rows(conn):
+            raise SystemExit(f"{args.db} me {EMPLOYEE_PREFIX}* intervals pehle se hain; naya --db do")
+
+        rows = make_employees(load_templates(args.templates), args.employees, rng)
+        insert_employees(backend, conn, rows)
+        app_ids = resolve_app_ids(backend, conn)
+        employees = [EmployeeDay(row, random.Random(rng.random())) for row in rows]
+
+        print(f"Generating {args.employees} employees x {args.days} days ({days[0]} .. {days[-1]}) -> {args.db}")
+        started = time.perf_counter()
+        totals = [0, 0, 0]
+        for day in days:
+            counts = insert_day(conn, day, employees, app_ids)
+            totals = [a + b for a, b in zip(totals, counts)]
+            elapsed = time.perf_counter() - started
+            print(f"  {day}: {counts[0]:>8,} intervals  (total {totals[0]:,}, {totals[0] / elapsed:,.0f}/s)")
+
+        print("Rebuilding rollups ...")
+        t0 = time.perf_counter()
+        rebuilt = backend.rebuild_rollups(conn, [d.isoformat() for d in days])
+        backend.refresh_group_rollup(conn)
+        rollup_s = time.perf_counter() - t0
+    backend.db_pool.close_all()
+
+    print(
+        f"\nDone: {totals[0]:,} intervals, {totals[1]:,} app_usage segments, {totals[2]:,} suspicious events "
+        f"in {time.perf_counter() - started:.0f}s (rollups {len(rebuilt)} days, {rollup_s:.1f}s)"
+    )
+    print(f"DB size: {db_size_bytes(args.db) / 1e6:,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
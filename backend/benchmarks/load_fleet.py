@@ -0,0 +1,281 @@
+"""
+Agent-fleet load test: N simulated agents har `--interval` seconds pe
+build_payload()-shaped interval POST /activity karte hain (real agent 8s pe),
+aur M managers /overview + /activity/{id} poll karte hain.
+
+    cd backend
+    python benchmarks/load_fleet.py --agents 2000 --interval 8 --duration 60
+    python benchmarks/load_fleet.py --agents 500 --interval 0.5 --managers 20 --mode queue
+
+Server `uvicorn main:app` alag process me temp DB pe chalta hai (offline,
+real nagster.db kabhi nahi chhuta). Report: ingest throughput, latency
+percentiles, status codes aur DB growth. Client side asyncio + httpx hai,
+taaki hazaron agents ek process me simulate ho sakein.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from _harness import db_size_bytes, import_main, latency_summary, print_table, seed_basic, serve_process
+
+try:
+    import httpx
+except ImportError:  # FastAPI TestClient bhi isi pe chalta hai, aksar installed hota hai
+    httpx = None
+
+APPS = [
+    ("chrome.exe", "Jira - Sprint board - Google Chrome"),
+    ("Code.exe", "agent.py - Nagster - Visual Studio Code"),
+    ("slack.exe", "Slack | #engineering"),
+    ("EXCEL.EXE", "Q3 report.xlsx - Excel"),
+    ("OUTLOOK.EXE", "Inbox - Outlook"),
+    ("Teams.exe", "Daily standup | Microsoft Teams"),
+]
+
+
+class AgentState:
+    """Ek agent ka running state (totals, current app) - build_payload ke liye."""
+
+    def __init__(self, employee_id: str, rng: random.Random):
+        self.employee_id = employee_id
+        self.rng = rng
+        self.app = rng.choice(APPS)
+        self.app_since = time.time()
+        self.total_active = 0
+        self.total_idle = 0
+        self.total_keys = 0
+        self.total_mouse = 0
+        self.total_windows = 0
+
+    def build_payload(self) -> dict:
+        """NagsterAgent.build_payload() jaisa shape, synthetic numbers ke saath."""
+        rng = self.rng
+        now = datetime.utcnow()
+        active = rng.choice((8, 8, 8, 7, 6, 4, 0))
+        idle = 8 - active
+        keys = rng.randint(0, 40) if active else 0
+        clicks = rng.randint(0, 6) if active else 0
+        moves = rng.randint(0, 200) if active else 0
+        scrolls = rng.randint(0, 10) if active else 0
+
+        app_usage = []
+        window_changes = 0
+        if rng.random() < 0.15:
+            prev_exe, prev_title = self.app
+            app_usage.append({
+                "app_exe": prev_exe,
+                "app_title": prev_title,
+                "duration": time.time() - self.app_since,
+                "end_time": now.isoformat(),
+            })
+            self.app = rng.choice(APPS)
+            self.app_since = time.time()
+            window_changes = 1
+        exe, title = self.app
+        app_usage.insert(0, {
+            "app_exe": exe,
+            "app_title": title,
+            "duration_seconds": min(time.time() - self.app_since, 8),
+            "percentage": 100,
+        })
+
+        suspicious_activities = []
+        if rng.random() < 0.002:
+            suspicious_activities.append({
+                "timestamp": now.isoformat(),
+                "type": "suspicious",
+                "reason": "Repeated key 'a' 0 times",
+                "key": "a",
+            })
+
+        self.total_active += active
+        self.total_idle += idle
+        self.total_keys += keys
+        self.total_mouse += clicks + moves + scrolls
+        self.total_windows += window_changes
+
+        return {
+            "employee_id": self.employee_id,
+            "timestamp": now.isoformat(),
+            "interval_start": (now - timedelta(seconds=8)).isoformat(),
+            "interval_end": now.isoformat(),
+            "active_seconds": active,
+            "idle_seconds": idle,
+            "suspicious": bool(suspicious_activities),
+            "keypresses": keys,
+            "mouse_clicks": clicks,
+            "mouse_moves": moves,
+            "scrolls": scrolls,
+            "window_changes": window_changes,
+            "current_app": {"exe": exe, "title": title, "start_time": None},
+            "current_activity": "typing" if keys else ("idle" if not active else "mouse"),
+            "activity_summary": [{"type": "key", "count": keys}] if keys else [],
+            "recent_activities": [
+                {"timestamp": now.isoformat(), "type": "key", "details": {"key": "e"}}
+                for _ in range(min(keys, 10))
+            ],
+            "app_usage": app_usage,
+            "suspicious_activities": suspicious_activities,
+            "total_active_seconds": self.total_active,
+            "total_idle_seconds": self.total_idle,
+            "total_keypresses": self.total_keys,
+            "total_mouse_events": self.total_mouse,
+            "total_window_changes": self.total_windows,
+            "interval_seconds": 8,
+            "is_realtime_update": True,
+        }
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.statuses: dict[str, dict] = {}
+
+    def record(self, kind: str, status, elapsed_ms: float):
+        self.latencies.setdefault(kind, []).append(elapsed_ms)
+        counts = self.statuses.setdefault(kind, {})
+        counts[status] = counts.get(status, 0) + 1
+
+
+async def agent_loop(client, state: AgentState, interval: float, stop_at: float, rec: Recorder):
+    # saare agents ek saath start na hon (real fleet bhi staggered hoti hai)
+    await asyncio.sleep(state.rng.uniform(0, interval))
+    while time.perf_counter() < stop_at:
+        payload = state.build_payload()
+        start = time.perf_counter()
+        try:
+            resp = await client.post("/activity", json=payload)
+            status = resp.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        rec.record("ingest", status, (time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def manager_loop(client, employee_ids: list[str], poll: float, stop_at: float, rec: Recorder, rng):
+    await asyncio.sleep(rng.uniform(0, poll))
+    for i in itertools.count():
+        if time.perf_counter() >= stop_at:
+            break
+        if i % 2 == 0:
+            kind, path = "GET /overview", "/overview"
+        else:
+            kind, path = "GET /activity/{id}", f"/activity/{rng.choice(employee_ids)}"
+        start = time.perf_counter()
+        try:
+            resp = await client.get(path)
+            status = resp.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        rec.record(kind, status, (time.perf_counter() - start) * 1000)
+        await asyncio.sleep(poll)
+
+
+async def run_fleet(url: str, args, employee_ids: list[str]) -> tuple[Recorder, float]:
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+        stop_at = start + args.duration
+        tasks = [
+            agent_loop(client, AgentState(emp, random.Random(i)), args.interval, stop_at, rec)
+            for i, emp in enumerate(employee_ids)
+        ]
+        tasks += [
+            manager_loop(client, employee_ids, args.poll, stop_at, rec, random.Random(10_000 + i))
+            for i in range(args.managers)
+        ]
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return rec, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between posts per agent (real: 8)")
+    parser.add_argument("--managers", type=int, default=10)
+    parser.add_argument("--poll", type=float, default=2.0, help="seconds between manager requests")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--mode", choices=("sync", "queue"), default="sync", help="NAGSTER_INGEST_MODE")
+    parser.add_argument("--connections", type=int, default=100, help="client HTTP connection pool")
+    parser.add_argument(
+        "--rate-per-minute", type=float,
+        help="NAGSTER_INGEST_RATE_PER_MINUTE for the server (default 0 = limit off)",
+    )
+    parser.add_argument("--out", help="results JSON file me bhi likho")
+    args = parser.parse_args()
+
+    if httpx is None:
+        raise SystemExit("httpx chahiye: pip install httpx")
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="nagster-fleet-"), "nagster.db")
+    backend = import_main(db_path)
+    backend.configure_database()
+    with backend.db_pool.connection() as conn:
+        backend.init_db(conn)
+    seed_basic(backend, args.agents, 0, datetime.utcnow().date().isoformat())
+    backend.db_pool.close_all()
+    employee_ids = [f"BENCH{i:05d}" for i in range(args.agents)]
+
+    size_before = db_size_bytes(db_path)
+    print(
+        f"Fleet: {args.agents} agents every {args.interval}s, {args.managers} managers every "
+        f"{args.poll}s, {args.duration}s, ingest mode={args.mode}"
+    )
+    # --interval real 8s se chhota hota hai; per-employee limit capacity naapne me aade na aaye
+    rate = args.rate_per_minute if args.rate_per_minute is not None else 0
+    with serve_process(db_path, NAGSTER_INGEST_MODE=args.mode, NAGSTER_INGEST_RATE_PER_MINUTE=rate) as url:
+        rec, elapsed = asyncio.run(run_fleet(url, args, employee_ids))
+    size_after = db_size_bytes(db_path)
+
+    ingest_ok = sum(n for s, n in rec.statuses.get("ingest", {}).items() if s in (200, 202))
+    rows = []
+    for kind in sorted(rec.latencies):
+        rows.append({
+            "kind": kind,
+            **latency_summary(rec.latencies[kind]),
+            "per_sec": round(len(rec.latencies[kind]) / elapsed, 1),
+            "statuses": " ".join(f"{s}:{n}" for s, n in sorted(rec.statuses[kind].items(), key=str)),
+        })
+
+    print()
+    print_table(rows, ["kind", "count", "per_sec", "p50_ms", "p95_ms", "p99_ms", "max_ms", "statuses"])
+    target = args.agents / args.interval
+    growth = size_after - size_before
+    print(
+        f"\nIngest: {ingest_ok} intervals accepted in {elapsed:.1f}s = {ingest_ok / elapsed:.1f}/s "
+        f"(offered {target:.1f}/s; 2,000 seats at 8s = 250/s)"
+    )
+    print(
+        f"DB growth: {growth / 1e6:.2f} MB ({size_before / 1e6:.2f} -> {size_after / 1e6:.2f} MB), "
+        f"{growth / ingest_ok if ingest_ok else 0:.0f} bytes/interval"
+    )
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "args": vars(args),
+                    "elapsed_s": round(elapsed, 2),
+                    "ingest_accepted": ingest_ok,
+                    "ingest_per_sec": round(ingest_ok / elapsed, 1),
+                    "db_bytes_before": size_before,
+                    "db_bytes_after": size_after,
+                    "results": rows,
+                },
+                f,
+                indent=2,
+            )
+        print("Saved", args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,111 @@
-from fastapi import FastAPI, Query, HTTPException, Header  
+from fastapi import FastAPI, Query, HTTPException, Header, Depends, Response, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from datetime import datetime, date
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import AliasChoices, BaseModel, Field, model_validator
+from datetime import datetime, date, timedelta
 import sqlite3
 import os
+import csv
+import io
+import json
+import math
+import queue
+import shutil
+import threading
+import time
+import zipfile
+import asyncio
+import itertools
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
 import jwt
-from typing import Optional, List
-
-DB_PATH = "nagster.db"
+from contextlib import contextmanager
+from metrics import MetricsMiddleware, registry as metrics
+from typing import Any, Optional, List
+
+try:
+    import orjson  # optional: 5-10x faster encode; na ho to stdlib json
+except ImportError:
+    orjson = None
+
+DB_PATH = os.environ.get("NAGSTER_DB_PATH", "nagster.db")
+DB_POOL_SIZE = int(os.environ.get("NAGSTER_DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT_SECONDS = 10  # itni der tak free connection ka wait, phir 503
+
+# Har pooled connection pe ek baar lagte hain (journal_mode=WAL startup pe)
+SQLITE_PRAGMAS = (
+    ("synchronous", "NORMAL"),  # WAL me safe, har commit pe fsync nahi
+    ("cache_size", "-16000"),  # ~16 MB page cache per connection
+    ("mmap_size", str(256 * 1024 * 1024)),
+    ("busy_timeout", "5000"),
+    ("temp_store", "MEMORY"),
+)
 SECRET_KEY = "supersecret_nagster_key_change_later"
 ALGORITHM = "HS256"
 
-app = FastAPI()
+MAX_BATCH_SIZE = 5000  # /activity/batch me ek request me max itne logs
+
+# "sync": har request commit tak wait karti hai
+# "queue": validate -> in-memory queue -> 202, background writer group commit karta hai
+INGEST_MODE = os.environ.get("NAGSTER_INGEST_MODE", "sync")
+INGEST_QUEUE_MAX_ROWS = int(os.environ.get("NAGSTER_INGEST_QUEUE_MAX_ROWS", "20000"))
+INGEST_FLUSH_ROWS = int(os.environ.get("NAGSTER_INGEST_FLUSH_ROWS", "500"))
+INGEST_FLUSH_MS = int(os.environ.get("NAGSTER_INGEST_FLUSH_MS", "200"))
+INGEST_RETRY_AFTER_SECONDS = 2  # queue full hone pe 429 ke saath
+# writer ek batch itni baar (exponential backoff ke saath) retry karta hai,
+# phir row-by-row; jo row phir bhi fail ho wo dead-letter NDJSON me jaati hai
+INGEST_FLUSH_MAX_ATTEMPTS = int(os.environ.get("NAGSTER_INGEST_FLUSH_MAX_ATTEMPTS", "5"))
+INGEST_DEAD_LETTER_PATH = os.environ.get("NAGSTER_INGEST_DEAD_LETTER_PATH", "ingest_dead_letter.ndjson")
+
+# Per-employee token bucket on /activity + /activity/batch. Agent 8s pe
+# bhejta hai (7.5/min); limit uske upar headroom + reconnect burst deta hai.
+# 0 = limit off.
+INGEST_RATE_PER_MINUTE = float(os.environ.get("NAGSTER_INGEST_RATE_PER_MINUTE", "30"))
+INGEST_RATE_BURST = int(os.environ.get("NAGSTER_INGEST_RATE_BURST", "10"))
+
+# Raw 8-second rows itne din live DB me, uske baad monthly zip archive me.
+# Rollups (daily/hourly/15m) hamesha rehte hain.
+RETENTION_DAYS = int(os.environ.get("NAGSTER_RETENTION_DAYS", "90"))
+ARCHIVE_DIR = os.environ.get("NAGSTER_ARCHIVE_DIR", "archive")
+# 0 = in-process scheduler off (tab `python manage.py retention` cron se chalao)
+RETENTION_INTERVAL_HOURS = float(os.environ.get("NAGSTER_RETENTION_INTERVAL_HOURS", "0"))
+
+# AppDictionary ke dono in-memory caches (har unique window title ek entry)
+APP_CACHE_MAX_ENTRIES = int(os.environ.get("NAGSTER_APP_CACHE_MAX_ENTRIES", "50000"))
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("NAGSTER_RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+# entry count ke saath total body bytes ka bhi budget (ek /activity din ~1 MB);
+# isse bade bodies cache hi nahi hote, sirf ETag/304 milta hai
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("NAGSTER_RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_MAX_BODY_BYTES = int(os.environ.get("NAGSTER_RESPONSE_CACHE_MAX_BODY_BYTES", str(1024 * 1024)))
+# aaj ki date ka response max itne seconds reuse (status "now" pe depend karta hai)
+CACHE_TODAY_TTL_SECONDS = 10
+
+# isse chhote responses compress nahi hote (CPU > bytes saved);
+# level 6 = zlib default, 9 ke mukable kaafi sasta aur size lagbhag same
+GZIP_MIN_BYTES = int(os.environ.get("NAGSTER_GZIP_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.environ.get("NAGSTER_GZIP_LEVEL", "6"))
+
+
+def dump_json(data) -> bytes:
+    """Compact UTF-8 JSON; orjson ho to uske saath."""
+    if orjson is not None:
+        # json.dumps int dict keys ko string bana deta hai, orjson bina option ke TypeError
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: dump_json() se render."""
+
+    def render(self, content) -> bytes:
+        return dump_json(content)
+
+
+app = FastAPI(default_response_class=FastJSONResponse)
 
 origins = [
     "http://127.0.0.1:5173",
@@ -28,11 +121,63 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # browser JS ko pagination cursors padhne do
+    expose_headers=["X-Next-After-Timestamp", "X-Next-After-Id", "ETag"],
+)
+# text/event-stream (/live) Starlette khud skip karta hai
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES, compresslevel=GZIP_LEVEL)
+# sabse bahar: latency me gzip + CORS bhi shamil
+app.add_middleware(MetricsMiddleware)
+
+
+# ========= METRICS =========
+# Gauges (pool, queue, cache, DB size) /metrics route ke paas register hote hain.
+
+INGEST_ROWS = metrics.counter(
+    "nagster_ingest_rows_total", "Activity intervals committed to activity_logs."
+)
+INGEST_COMMITS = metrics.counter(
+    "nagster_ingest_commits_total", "Ingest transactions committed."
+)
+INGEST_COMMIT_SECONDS = metrics.histogram(
+    "nagster_ingest_commit_duration_seconds", "store_activity_logs() time per transaction."
+)
+DB_QUERY_SECONDS = metrics.histogram(
+    "nagster_db_query_duration_seconds", "Read query time on the DB executor, by query.", ("query",)
+)
+DB_QUERY_ROWS = metrics.counter(
+    "nagster_db_query_rows_total", "Top-level rows returned by read queries, by query.", ("query",)
+)
+DB_POOL_WAIT_SECONDS = metrics.histogram(
+    "nagster_db_pool_wait_seconds", "Time spent waiting for a pooled connection."
+)
+INGEST_RATE_LIMITED = metrics.counter(
+    "nagster_ingest_rate_limited_total", "Ingest requests rejected with 429 by the per-employee limit.", ("route",)
 )
 
 
 # ========= MODELS =========
 
+class AppUsageSegment(BaseModel):
+    app_exe: str | None = None
+    app_title: str | None = None
+    # current app "duration_seconds" bhejta hai, pichhle apps "duration"
+    duration_seconds: float = Field(0, validation_alias=AliasChoices("duration_seconds", "duration"))
+    end_time: str | None = None
+
+
+class SuspiciousEvent(BaseModel):
+    timestamp: str | None = None
+    reason: str | None = None
+    key: str | None = None
+    details: Any = None
+
+
+class CurrentApp(BaseModel):
+    exe: str | None = None
+    title: str | None = None
+
+
 class ActivityLog(BaseModel):
     employee_id: str
     timestamp: datetime
@@ -42,6 +187,27 @@ class ActivityLog(BaseModel):
     active_app_exe: str | None = None
     active_app_title: str | None = None
 
+    # agent ke build_payload() wale interval counters
+    keypresses: int = 0
+    mouse_clicks: int = 0
+    mouse_moves: int = 0
+    scrolls: int = 0
+    window_changes: int = 0
+
+    current_app: CurrentApp | None = None
+    app_usage: List[AppUsageSegment] = []
+    suspicious_activities: List[SuspiciousEvent] = []
+    # recent_activities / activity_summary jaan-boojh ke store nahi karte:
+    # unme individual key names hain (privacy), aur counters already upar hain
+
+    @model_validator(mode="after")
+    def fill_active_app(self):
+        """Agent active_app_* nahi, current_app {exe, title} bhejta hai."""
+        if self.active_app_exe is None and self.active_app_title is None and self.current_app:
+            self.active_app_exe = self.current_app.exe
+            self.active_app_title = self.current_app.title
+        return self
+
 
 class UserSignup(BaseModel):
     username: str
@@ -73,12 +239,169 @@ class EmployeeCreate(BaseModel):
 
 # ========= DB HELPERS =========
 
-def get_connection():
-    conn = sqlite3.connect(DB_PATH)
+def get_connection(path: str | None = None):
+    """Naya standalone connection (pragmas ke saath). Routes pool use karte hain."""
+    conn = sqlite3.connect(path or DB_PATH, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    for name, value in SQLITE_PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
     return conn
 
 
+class ConnectionPool:
+    """
+    Long-lived SQLite connections, threads ke beech share hote hain
+    (FastAPI sync routes/dependencies threadpool me chalte hain).
+    Connections lazily khulte hain, max `size` tak.
+    """
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = DB_POOL_TIMEOUT_SECONDS):
+        start = time.perf_counter()
+        try:
+            return self._acquire(timeout)
+        finally:
+            DB_POOL_WAIT_SECONDS.observe((), time.perf_counter() - start)
+
+    def _acquire(self, timeout: float):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return get_connection(self.path)
+                except Exception:
+                    self._opened -= 1
+                    raise
+
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise HTTPException(status_code=503, detail="Database busy, try again")
+
+    def release(self, conn):
+        # aadhi-adhuri transaction agle user ko nahi milni chahiye
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> dict:
+        return {"size": self.size, "open": self._opened, "idle": self._idle.qsize()}
+
+    def close_all(self):
+        with self._lock:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+                self._opened -= 1
+
+
+db_pool = ConnectionPool(DB_PATH, DB_POOL_SIZE)
+
+
+def get_db():
+    """FastAPI dependency: pool se connection, request ke baad wapas."""
+    with db_pool.connection() as conn:
+        yield conn
+
+
+def result_rows(result) -> int:
+    """Query result ki top-level rows (metrics ke liye)."""
+    if isinstance(result, tuple):  # (rows, next_cursor)
+        result = result[0]
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(len(v) for v in result.values() if isinstance(v, list)) or 1
+    return 0 if result is None else 1
+
+
+class AsyncDB:
+    """
+    Async routes ke liye data-access layer: blocking SQLite kaam dedicated
+    DB executor threads pe chalta hai, event loop free rehta hai.
+
+        rows = await adb.run(query_fn, arg1, arg2)   # query_fn(conn, arg1, arg2)
+
+    Workers = pool size, taaki har worker ko turant connection mile.
+    """
+
+    def __init__(self, pool: ConnectionPool, workers: int):
+        self.pool = pool
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="nagster-db"
+                    )
+        return self._executor
+
+    def _call(self, fn, args):
+        with self.pool.connection() as conn:
+            start = time.perf_counter()
+            result = fn(conn, *args)
+        name = fn.__name__.removeprefix("query_")
+        DB_QUERY_SECONDS.observe((name,), time.perf_counter() - start)
+        DB_QUERY_ROWS.inc((name,), result_rows(result))
+        return result
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self._call, fn, args)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+adb = AsyncDB(db_pool, DB_POOL_SIZE)
+
+
+def configure_database(path: str | None = None):
+    """
+    One-time DB settings. journal_mode=WAL file me persist hota hai, isliye
+    sirf startup pe set karte hain: readers writer ko block nahi karte.
+
+    auto_vacuum=INCREMENTAL sirf khaali file pe lagta hai (WAL header aur
+    pehli table se pehle), isliye ye numbered migration nahi ho sakta: naye
+    DB yahin se INCREMENTAL bante hain, existing DB pe ye no-op hai (unke
+    liye `python manage.py enable-incremental-vacuum`, ek baar, server band karke).
+    """
+    conn = sqlite3.connect(path or DB_PATH)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+    conn.close()
+    return mode
+
+
 def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode("utf-8")).hexdigest()
 
@@ -97,103 +420,2012 @@ def create_access_token(username: str, role: str) -> str:
     return token
 
 
-def get_user_by_username(username: str) -> Optional[sqlite3.Row]:
-    conn = get_connection()
+def get_user_by_username(conn, username: str) -> Optional[sqlite3.Row]:
     cur = conn.cursor()
     cur.execute("SELECT * FROM users WHERE username = ?", (username,))
-    row = cur.fetchone()
-    conn.close()
-    return row
+    return cur.fetchone()
 
 
-# 🔴 NEW: helper to check if employee exists
-def employee_exists(emp_id: str) -> bool:
-    conn = get_connection()
+# ========= EMPLOYEE REGISTRY =========
+
+# /employees/{id} aur registry dono yahi columns dete hain
+EMPLOYEE_BASIC_COLUMNS = (
+    "employee_id", "name", "designation", "domain", "department",
+    "location", "work_mode", "status",
+)
+# registry inke alawa manager_name bhi rakhta hai (/live filters ke liye)
+REGISTRY_COLUMNS = EMPLOYEE_BASIC_COLUMNS + ("manager_name",)
+
+
+class EmployeeRegistry:
+    """
+    In-memory employee_id -> basic info, startup pe load hota hai aur
+    add/remove/ingest ke saath update. Ingest validation aur agent ka
+    startup verify isse O(1) me ho jaata hai, DB query ke bina.
+
+    Miss hone pe callers DB check karke `put()` karte hain, taaki dusre
+    worker process me add hua employee bhi mil jaye.
+    """
+
+    def __init__(self):
+        self._by_id: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def load(self, conn):
+        cur = conn.cursor()
+        cur.execute(f"SELECT {', '.join(REGISTRY_COLUMNS)} FROM employees")
+        by_id = {row["employee_id"]: dict(row) for row in cur.fetchall()}
+        with self._lock:
+            self._by_id = by_id
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def contains(self, emp_id: str) -> bool:
+        return emp_id in self._by_id
+
+    def get(self, emp_id: str) -> dict | None:
+        """Public basic info (EMPLOYEE_BASIC_COLUMNS), copy."""
+        row = self._by_id.get(emp_id)
+        return {col: row[col] for col in EMPLOYEE_BASIC_COLUMNS} if row is not None else None
+
+    def info(self, emp_id: str) -> dict | None:
+        """Poori stored row (manager_name ke saath). Read-only, mutate mat karo."""
+        return self._by_id.get(emp_id)
+
+    def put(self, row: dict):
+        with self._lock:
+            self._by_id[row["employee_id"]] = {col: row.get(col) for col in REGISTRY_COLUMNS}
+
+    def remove(self, emp_id: str):
+        with self._lock:
+            self._by_id.pop(emp_id, None)
+
+    def not_active(self, emp_ids: set[str]) -> set[str]:
+        """Jin employees ka status abhi 'Active' nahi hai."""
+        by_id = self._by_id
+        return {e for e in emp_ids if e not in by_id or by_id[e]["status"] != "Active"}
+
+    def mark_active(self, emp_ids: set[str]):
+        with self._lock:
+            for emp_id in emp_ids:
+                row = self._by_id.get(emp_id)
+                if row is not None:
+                    self._by_id[emp_id] = {**row, "status": "Active"}
+
+
+employee_registry = EmployeeRegistry()
+
+
+def fetch_employees_basic(conn, emp_ids: set[str]) -> list[dict]:
+    """DB fallback for registry misses; found rows registry me bhi daal deta hai."""
+    if not emp_ids:
+        return []
+    ids = list(emp_ids)
+    placeholders = ", ".join("?" for _ in ids)
     cur = conn.cursor()
-    cur.execute("SELECT 1 FROM employees WHERE employee_id = ?", (emp_id,))
-    row = cur.fetchone()
-    conn.close()
-    return row is not None
+    cur.execute(
+        f"SELECT {', '.join(REGISTRY_COLUMNS)} FROM employees WHERE employee_id IN ({placeholders})",
+        ids,
+    )
+    rows = [dict(row) for row in cur.fetchall()]
+    for row in rows:
+        employee_registry.put(row)
+    return [{col: row[col] for col in EMPLOYEE_BASIC_COLUMNS} for row in rows]
 
 
-def init_db():
-    conn = get_connection()
+# ========= APP DICTIONARY =========
+
+class AppDictionary:
+    """
+    (exe, title) -> apps.app_id, in-memory cache ke saath.
+
+    Same strings ("chrome.exe", ...) din me hazaron baar aati hain, isliye
+    tables me sirf integer app_id jaata hai. None ko '' store karte hain
+    taaki UNIQUE (exe, title) kaam kare. apps rows kabhi update/delete nahi
+    hoti, isliye dono caches (key -> id, id -> names) kabhi stale nahi hote.
+    Titles ki cardinality unbounded hai (har document / tab), isliye dono
+    caches LRU hain, `max_entries` tak; evicted key agli baar DB se aati hai.
+    """
+
+    def __init__(self, max_entries: int = APP_CACHE_MAX_ENTRIES):
+        self.max_entries = max(max_entries, 1)
+        self._ids: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._names: OrderedDict[int, tuple[str | None, str | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _lru_get(cache: OrderedDict, key):
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def _lru_put(self, cache: OrderedDict, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    @staticmethod
+    def key(exe: str | None, title: str | None) -> tuple[str, str]:
+        return (exe or "", title or "")
+
+    @staticmethod
+    def log_key(log: "ActivityLog") -> tuple[str, str] | None:
+        """Interval ka active app key; koi app nahi to None (app_id NULL)."""
+        if log.active_app_exe is None and log.active_app_title is None:
+            return None
+        return AppDictionary.key(log.active_app_exe, log.active_app_title)
+
+    @staticmethod
+    def exe_key(log: "ActivityLog") -> tuple[str, str] | None:
+        """Exe-level apps row (title ''), daily_app_rollup isi pe group karta hai."""
+        if not log.active_app_exe:
+            return None
+        return (log.active_app_exe, "")
+
+    def ids_for(self, cur, keys: set[tuple[str, str]]) -> tuple[dict, dict]:
+        """
+        (ids, fresh): fresh = is transaction me DB se resolve hue ids.
+        fresh ko commit ke baad hi remember() karo, rollback pe naye
+        app_id gayab ho jaate hain.
+        """
+        ids = {}
+        missing = []
+        with self._lock:
+            for k in keys:
+                app_id = self._lru_get(self._ids, k)
+                if app_id is None:
+                    missing.append(k)
+                else:
+                    ids[k] = app_id
+
+        fresh = {}
+        if missing:
+            cur.executemany("INSERT OR IGNORE INTO apps (exe, title) VALUES (?, ?)", missing)
+            for i in range(0, len(missing), 400):
+                chunk = missing[i:i + 400]
+                cur.execute(
+                    f"""
+                    SELECT app_id, exe, title FROM apps
+                    WHERE (exe, title) IN (VALUES {', '.join('(?, ?)' for _ in chunk)})
+                    """,
+                    [v for k in chunk for v in k],
+                )
+                for row in cur.fetchall():
+                    fresh[(row["exe"], row["title"])] = row["app_id"]
+            ids.update(fresh)
+        return ids, fresh
+
+    def remember(self, fresh: dict):
+        if fresh:
+            with self._lock:
+                for (exe, title), app_id in fresh.items():
+                    self._lru_put(self._ids, (exe, title), app_id)
+                    self._lru_put(self._names, app_id, (exe or None, title or None))
+
+    def names_for(self, cur, app_ids: set[int]) -> dict[int, tuple[str | None, str | None]]:
+        """app_id -> (exe, title) decode, sirf committed rows ke liye."""
+        names = {}
+        missing = []
+        with self._lock:
+            for app_id in app_ids:
+                if app_id is None:
+                    continue
+                pair = self._lru_get(self._names, app_id)
+                if pair is None:
+                    missing.append(app_id)
+                else:
+                    names[app_id] = pair
+
+        fresh = {}
+        for i in range(0, len(missing), 500):
+            chunk = missing[i:i + 500]
+            cur.execute(
+                f"SELECT app_id, exe, title FROM apps WHERE app_id IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            )
+            for row in cur.fetchall():
+                fresh[(row["exe"], row["title"])] = row["app_id"]
+        if fresh:
+            self.remember(fresh)
+            names.update({app_id: (exe or None, title or None) for (exe, title), app_id in fresh.items()})
+        return names
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+            self._names.clear()
+
+
+app_dictionary = AppDictionary()
+
+# interval ke child tables (activity_logs.id -> activity_id)
+DETAIL_TABLES = ("app_usage", "suspicious_events")
+
+
+# ========= RESPONSE CACHE =========
+#
+# Dashboard GETs (/overview, /summary, /activity, /timeline) ka JSON body
+# (endpoint + params + data version) pe cache hota hai, aur wahi ETag banta
+# hai: If-None-Match match kare to 304 bina DB touch kiye.
+#
+# Data version per date hai: ingest us date ko bump karta hai, employee
+# add/remove sab kuch bump karta hai. Employee ka status (Inactive -> Active)
+# date se bandha nahi, uska alag per-employee version hai; jo response status
+# dikhata hai (/summary) wo cached_json(employee_id=...) se use key me daalta
+# hai. Purani dates kabhi bump nahi hoti to
+# unke entries tab tak valid hain jab tak LRU evict na kare; aaj/future
+# wali ranges pe CACHE_TODAY_TTL_SECONDS ka extra slot lagta hai.
+# Versions process-local hain: multi-worker deploy me dusre worker ka ingest
+# yahan sirf TTL slot ke through dikhta hai (today), aur CLI se chala
+# retention/rebuild purani dates ke liye restart tak nahi.
+
+class DataVersions:
+    def __init__(self):
+        self._counter = itertools.count(1)
+        self._by_date: dict[str, int] = {}
+        self._by_employee: dict[str, int] = {}
+        self._all = 0
+        self._lock = threading.Lock()
+
+    def bump_dates(self, dates):
+        with self._lock:
+            version = next(self._counter)
+            for day in dates:
+                self._by_date[day] = version
+
+    def bump_employees(self, emp_ids):
+        with self._lock:
+            version = next(self._counter)
+            for emp_id in emp_ids:
+                self._by_employee[emp_id] = version
+
+    def employee_version(self, emp_id: str) -> int:
+        return max(self._all, self._by_employee.get(emp_id, 0))
+
+    def bump_all(self):
+        with self._lock:
+            self._all = next(self._counter)
+
+    def version(self, start: str, end: str) -> int:
+        latest = self._all
+        for day, version in list(self._by_date.items()):
+            if start <= day <= end and version > latest:
+                latest = version
+        return latest
+
+
+class ResponseCache:
+    """LRU: etag -> (body bytes, extra headers), entries aur total bytes dono pe bounded."""
+
+    def __init__(self, max_entries: int, max_bytes: int, max_body_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_body_bytes = min(max_body_bytes, max_bytes)
+        self._entries: OrderedDict[str, tuple[bytes, dict]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.skipped_large = 0
+
+    def get(self, etag: str):
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def put(self, etag: str, body: bytes, headers: dict):
+        if len(body) > self.max_body_bytes:
+            self.skipped_large += 1
+            return
+        with self._lock:
+            old = self._entries.pop(etag, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._entries[etag] = (body, headers)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "skipped_large": self.skipped_large,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
+
+
+BOOT_ID = uuid.uuid4().hex[:8]  # restart ke baad purane ETags match na ho
+data_versions = DataVersions()
+response_cache = ResponseCache(
+    RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_MAX_BODY_BYTES
+)
+
+
+async def cached_json(
+    request: Request, start: str, end: str, build, employee_id: str | None = None
+) -> Response:
+    """
+    `build()` async callable hai jo (data, extra_headers) deta hai; sirf
+    cache miss pe chalta hai. Errors (HTTPException) cache nahi hote.
+    Body me employee ka live status ho to `employee_id` do: status badle to
+    purani ranges ka entry bhi invalid.
+    """
+    live = end >= date.today().isoformat()
+    ttl_slot = int(time.time() // CACHE_TODAY_TTL_SECONDS) if live else 0
+    key = (
+        BOOT_ID,
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        start,
+        end,
+        data_versions.version(start, end),
+        data_versions.employee_version(employee_id) if employee_id else 0,
+        ttl_slot,
+    )
+    # weak: GZipMiddleware same ETag ke saath gzip ya identity body bhejta hai,
+    # dono semantically same hain par byte-for-byte nahi
+    etag = 'W/"' + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:24] + '"'
+    cache_headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache" if live else "private, max-age=300",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    # If-None-Match weak comparison: W/ prefix ignore (kuch proxies hata dete hain)
+    if if_none_match and etag[2:] in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+        response_cache.not_modified += 1
+        return Response(status_code=304, headers=cache_headers)
+
+    entry = response_cache.get(etag)
+    if entry is None:
+        data, extra_headers = await build()
+        body = dump_json(data)
+        entry = (body, extra_headers)
+        response_cache.put(etag, body, extra_headers)
+
+    body, extra_headers = entry
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**cache_headers, **extra_headers},
+    )
+
+
+# 🔴 NEW: helper to check if employee exists
+def employee_exists(conn, emp_id: str) -> bool:
+    if employee_registry.contains(emp_id):
+        return True
+    return bool(fetch_employees_basic(conn, {emp_id}))
+
+
+def missing_employees(conn, emp_ids: set[str]) -> set[str]:
+    """Return the subset of emp_ids that are not in employees."""
+    unknown = {e for e in emp_ids if not employee_registry.contains(e)}
+    found = {row["employee_id"] for row in fetch_employees_basic(conn, unknown)}
+    return unknown - found
+
+
+def activity_row(log: ActivityLog, app_ids: dict) -> tuple:
+    """ActivityLog -> activity_logs INSERT params."""
+    app_key = AppDictionary.log_key(log)
+    return (
+        log.employee_id,
+        log.timestamp.date().isoformat(),
+        log.timestamp.isoformat(),
+        log.active_seconds,
+        log.idle_seconds,
+        1 if log.suspicious else 0,
+        app_ids[app_key] if app_key is not None else None,
+        log.keypresses,
+        log.mouse_clicks,
+        log.mouse_moves,
+        log.scrolls,
+        log.window_changes,
+    )
+
+
+def interval_app_keys(logs: List[ActivityLog]) -> set[tuple[str, str]]:
+    """Batch ke saare (exe, title) keys: active app + app_usage segments."""
+    keys = {AppDictionary.log_key(log) for log in logs}
+    keys.update(AppDictionary.exe_key(log) for log in logs)
+    keys.discard(None)
+    for log in logs:
+        for seg in log.app_usage:
+            keys.add(AppDictionary.key(seg.app_exe, seg.app_title))
+    return keys
+
+
+def store_interval_details(cur, logs: List[ActivityLog], first_id: int, app_ids: dict):
+    """
+    app_usage segments + suspicious events insert karo. logs[i] ka
+    activity_logs.id = first_id + i.
+    """
+    usage_rows = []
+    event_rows = []
+    for activity_id, log in enumerate(logs, start=first_id):
+        day = log.timestamp.date().isoformat()
+        for seg in log.app_usage:
+            usage_rows.append((
+                activity_id,
+                log.employee_id,
+                day,
+                app_ids[AppDictionary.key(seg.app_exe, seg.app_title)],
+                int(seg.duration_seconds * 1000),
+                seg.end_time,
+            ))
+        for event in log.suspicious_activities:
+            details = event.details
+            if details is not None and not isinstance(details, str):
+                details = json.dumps(details)
+            event_rows.append((
+                activity_id,
+                log.employee_id,
+                day,
+                event.timestamp or log.timestamp.isoformat(),
+                event.reason,
+                event.key,
+                details,
+            ))
+
+    if usage_rows:
+        cur.executemany(
+            """
+            INSERT INTO app_usage (activity_id, employee_id, date, app_id, duration_ms, end_time)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            usage_rows,
+        )
+    if event_rows:
+        cur.executemany(
+            """
+            INSERT INTO suspicious_events (activity_id, employee_id, date, timestamp, reason, key, details)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            event_rows,
+        )
+
+
+def store_activity_logs(conn, logs: List[ActivityLog]):
+    """
+    Insert intervals + mark their employees Active, single transaction.
+    Caller is responsible for validating employee IDs first.
+    """
+    start = time.perf_counter()
     cur = conn.cursor()
 
-    # activity logs table
-    cur.execute(
+    # app strings -> app_id (zyadatar cache hit; naye apps isi transaction me)
+    app_ids, fresh_apps = app_dictionary.ids_for(cur, interval_app_keys(logs))
+
+    cur.executemany(
         """
-        CREATE TABLE IF NOT EXISTS activity_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            employee_id TEXT NOT NULL,
-            date TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
-            active_seconds INTEGER NOT NULL,
-            idle_seconds INTEGER NOT NULL,
-            suspicious INTEGER NOT NULL,
-            active_app_exe TEXT,
-            active_app_title TEXT
+        INSERT INTO activity_logs (
+            employee_id, date, timestamp,
+            active_seconds, idle_seconds, suspicious, app_id,
+            keypresses, mouse_clicks, mouse_moves, scrolls, window_changes
         )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [activity_row(log, app_ids) for log in logs],
+    )
+
+    if any(log.app_usage or log.suspicious_activities for log in logs):
+        # AUTOINCREMENT + ek hi write transaction: executemany ki rows ko
+        # lagatar ids milti hain, isliye last_insert_rowid() se peeche ginte hain
+        last_id = cur.execute("SELECT last_insert_rowid()").fetchone()[0]
+        store_interval_details(cur, logs, last_id - len(logs) + 1, app_ids)
+
+    # jin employees ne log bheja unhe Active mark karo
+    # (registry me already Active hain to UPDATE skip)
+    to_activate = employee_registry.not_active({log.employee_id for log in logs})
+    if to_activate:
+        cur.executemany(
+            "UPDATE employees SET status = 'Active' WHERE employee_id = ?",
+            [(emp_id,) for emp_id in to_activate],
+        )
+
+    apply_rollups(cur, logs, app_ids)
+    mark_group_rollup_dirty(cur, {log.timestamp.date().isoformat() for log in logs})
+
+    day_totals = {}
+    if live_hub.has_subscribers():
+        day_totals = read_day_totals(
+            cur, {(log.employee_id, log.timestamp.date().isoformat()) for log in logs}
+        )
+
+    conn.commit()
+    INGEST_COMMIT_SECONDS.observe((), time.perf_counter() - start)
+    INGEST_COMMITS.inc()
+    INGEST_ROWS.inc((), len(logs))
+    app_dictionary.remember(fresh_apps)
+    employee_registry.mark_active(to_activate)
+    data_versions.bump_dates({log.timestamp.date().isoformat() for log in logs})
+    if to_activate:
+        data_versions.bump_employees(to_activate)
+    live_hub.publish_intervals(logs, day_totals)
+
+
+# ========= ROLLUPS =========
+#
+# Dashboard endpoints raw activity_logs nahi padhte, ye pre-aggregated
+# tables padhte hain. Ingest same transaction me inhe upsert karta hai;
+# `python manage.py rebuild-rollups` raw logs se dobara bana deta hai.
+
+# Timeline buckets: name -> (table, width in minutes)
+TIMELINE_BUCKETS = {
+    "15m": ("activity_rollup_15m", 15),
+    "1h": ("activity_rollup_hourly", 60),
+}
+
+
+def bucket_start(ts: datetime, minutes: int) -> str:
+    """Interval ko uske bucket ke start se identify karo: 'YYYY-MM-DDTHH:MM:00'."""
+    return ts.replace(minute=(ts.minute // minutes) * minutes).strftime("%Y-%m-%dT%H:%M:00")
+
+
+def _bucket_start_sql(minutes: int) -> str:
+    """bucket_start() ka SQL version, text timestamp column pe."""
+    if minutes == 60:
+        return "substr(timestamp, 1, 13) || ':00:00'"
+    return (
+        "substr(timestamp, 1, 14) || "
+        f"printf('%02d', (CAST(substr(timestamp, 15, 2) AS INTEGER) / {minutes}) * {minutes}) || ':00'"
+    )
+
+
+def rollup_tables() -> list[str]:
+    return (
+        ["daily_activity_rollup", "daily_app_rollup"]
+        + [table for table, _ in TIMELINE_BUCKETS.values()]
+    )
+
+
+def apply_rollups(cur, logs: List[ActivityLog], app_ids: dict):
+    """
+    Batch ko (employee_id, date[, bucket | app]) pe pehle Python me aggregate,
+    phir upsert. app_ids = app_dictionary.ids_for() ka result.
+    """
+    daily: dict[tuple, list] = {}
+    for log in logs:
+        key = (log.employee_id, log.timestamp.date().isoformat())
+        ts = log.timestamp.isoformat()
+        agg = daily.get(key)
+        if agg is None:
+            daily[key] = [ts, ts, log.active_seconds, log.idle_seconds, 1 if log.suspicious else 0, 1]
+        else:
+            agg[0] = min(agg[0], ts)
+            agg[1] = max(agg[1], ts)
+            agg[2] += log.active_seconds
+            agg[3] += log.idle_seconds
+            agg[4] += 1 if log.suspicious else 0
+            agg[5] += 1
+
+    cur.executemany(
         """
+        INSERT INTO daily_activity_rollup (
+            employee_id, date, first_timestamp, last_timestamp,
+            active_seconds, idle_seconds, suspicious_count, intervals
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (employee_id, date) DO UPDATE SET
+            first_timestamp = MIN(first_timestamp, excluded.first_timestamp),
+            last_timestamp = MAX(last_timestamp, excluded.last_timestamp),
+            active_seconds = active_seconds + excluded.active_seconds,
+            idle_seconds = idle_seconds + excluded.idle_seconds,
+            suspicious_count = suspicious_count + excluded.suspicious_count,
+            intervals = intervals + excluded.intervals
+        """,
+        [(emp_id, day, *agg) for (emp_id, day), agg in daily.items()],
     )
 
-    # employees table
+    for table, minutes in TIMELINE_BUCKETS.values():
+        buckets: dict[tuple, list] = {}
+        for log in logs:
+            key = (
+                log.employee_id,
+                log.timestamp.date().isoformat(),
+                bucket_start(log.timestamp, minutes),
+            )
+            agg = buckets.setdefault(key, [0, 0, 0, 0])
+            agg[0] += log.active_seconds
+            agg[1] += log.idle_seconds
+            agg[2] += 1 if log.suspicious else 0
+            agg[3] += 1
+
+        cur.executemany(
+            f"""
+            INSERT INTO {table} (
+                employee_id, date, bucket_start,
+                active_seconds, idle_seconds, suspicious_count, intervals
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (employee_id, date, bucket_start) DO UPDATE SET
+                active_seconds = active_seconds + excluded.active_seconds,
+                idle_seconds = idle_seconds + excluded.idle_seconds,
+                suspicious_count = suspicious_count + excluded.suspicious_count,
+                intervals = intervals + excluded.intervals
+            """,
+            [(*key, *agg) for key, agg in buckets.items()],
+        )
+
+    # active app time, exe level pe (titles bahut zyada unique hote hain)
+    apps: dict[tuple, list] = {}
+    for log in logs:
+        exe_key = AppDictionary.exe_key(log)
+        if exe_key is None:
+            continue
+        key = (log.timestamp.date().isoformat(), log.employee_id, app_ids[exe_key])
+        agg = apps.setdefault(key, [0, 0])
+        agg[0] += log.active_seconds
+        agg[1] += 1
+
+    if apps:
+        cur.executemany(
+            """
+            INSERT INTO daily_app_rollup (date, employee_id, app_id, active_seconds, intervals)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (date, employee_id, app_id) DO UPDATE SET
+                active_seconds = active_seconds + excluded.active_seconds,
+                intervals = intervals + excluded.intervals
+            """,
+            [(*key, *agg) for key, agg in apps.items()],
+        )
+
+
+def _date_filter(dates: list[str] | None, column: str = "date") -> tuple[str, list]:
+    if dates is None:
+        return "", []
+    return f"WHERE {column} IN ({', '.join('?' for _ in dates)})", list(dates)
+
+
+def rebuild_daily_rollup(cur, dates: list[str] | None = None):
+    where, params = _date_filter(dates)
+    cur.execute(f"DELETE FROM daily_activity_rollup {where}", params)
     cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS employees (
-            employee_id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            email TEXT,
-            phone TEXT,
-            designation TEXT,
-            domain TEXT,
-            department TEXT,
-            location TEXT,
-            work_mode TEXT,
-            employee_type TEXT,
-            salary_band TEXT,
-            joining_date TEXT,
-            manager_name TEXT,
-            manager_email TEXT,
-            status TEXT
+        f"""
+        INSERT INTO daily_activity_rollup (
+            employee_id, date, first_timestamp, last_timestamp,
+            active_seconds, idle_seconds, suspicious_count, intervals
         )
-        """
+        SELECT
+            employee_id, date, MIN(timestamp), MAX(timestamp),
+            SUM(active_seconds), SUM(idle_seconds), SUM(suspicious), COUNT(*)
+        FROM activity_logs
+        {where}
+        GROUP BY employee_id, date
+        """,
+        params,
     )
 
-    # users table
+
+def rebuild_bucket_rollup(cur, table: str, minutes: int, dates: list[str] | None = None):
+    where, params = _date_filter(dates)
+    cur.execute(f"DELETE FROM {table} {where}", params)
     cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            role TEXT NOT NULL
+        f"""
+        INSERT INTO {table} (
+            employee_id, date, bucket_start,
+            active_seconds, idle_seconds, suspicious_count, intervals
         )
+        SELECT
+            employee_id, date, {_bucket_start_sql(minutes)} AS bucket,
+            SUM(active_seconds), SUM(idle_seconds), SUM(suspicious), COUNT(*)
+        FROM activity_logs
+        {where}
+        GROUP BY employee_id, date, bucket
+        """,
+        params,
+    )
+
+
+def rebuild_app_rollup(cur, dates: list[str] | None = None):
+    where, params = _date_filter(dates, "a.date")
+    cur.execute(f"DELETE FROM daily_app_rollup {_date_filter(dates)[0]}", params)
+    # purane/backfilled apps ke exe-level rows shayad abhi bane hi na hon
+    cur.execute(
+        f"""
+        INSERT OR IGNORE INTO apps (exe, title)
+        SELECT DISTINCT p.exe, ''
+        FROM activity_logs a
+        JOIN apps p ON p.app_id = a.app_id
+        {where}
+        """,
+        params,
+    )
+    cur.execute(
+        f"""
+        INSERT INTO daily_app_rollup (date, employee_id, app_id, active_seconds, intervals)
+        SELECT a.date, a.employee_id, x.app_id, SUM(a.active_seconds), COUNT(*)
+        FROM activity_logs a
+        JOIN apps p ON p.app_id = a.app_id
+        JOIN apps x ON x.exe = p.exe AND x.title = ''
+        {where}{' AND' if where else 'WHERE'} p.exe != ''
+        GROUP BY a.date, a.employee_id, x.app_id
+        """,
+        params,
+    )
+
+
+def rebuild_rollups(conn, dates: list[str] | None = None) -> list[str]:
+    """
+    Raw activity_logs se rollups dobara banao (dates=None -> jin dates ke
+    raw logs hain). Archived dates skip hoti hain: unke raw logs delete ho
+    chuke hain, ab rollups hi source of truth hain. Rebuilt dates return.
+    """
+    cur = conn.cursor()
+    if dates is None:
+        cur.execute("SELECT DISTINCT date FROM activity_logs ORDER BY date")
+        dates = [row[0] for row in cur.fetchall()]
+
+    archived = archived_dates(cur, dates)
+    dates = [d for d in dates if d not in archived]
+    if not dates:
+        return []
+
+    cur.execute("BEGIN")
+    try:
+        rebuild_daily_rollup(cur, dates)
+        rebuild_app_rollup(cur, dates)
+        for table, minutes in TIMELINE_BUCKETS.values():
+            rebuild_bucket_rollup(cur, table, minutes, dates)
+        mark_group_rollup_dirty(cur, dates)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return dates
+
+
+# ========= GROUP ROLLUP =========
+#
+# daily_group_rollup = daily_activity_rollup, employee attributes pe grouped.
+# Ingest sirf date ko group_rollup_dirty me mark karta hai (sasta); dirty
+# dates /analytics/groups padhne se pehle recompute hoti hain.
+
+# ?by= -> employees column
+GROUP_DIMENSIONS = {
+    "department": "department",
+    "location": "location",
+    "work_mode": "work_mode",
+    "domain": "domain",
+    "manager": "manager_name",
+}
+
+
+def mark_group_rollup_dirty(cur, dates):
+    cur.executemany(
+        "INSERT OR IGNORE INTO group_rollup_dirty (date) VALUES (?)",
+        [(d,) for d in dates],
+    )
+
+
+def refresh_group_rollup(conn, start: str | None = None, end: str | None = None) -> list[str]:
+    """[start, end] ki dirty dates recompute karo; refreshed dates return."""
+    cur = conn.cursor()
+    # IMMEDIATE: write lock pehle lo, taaki beech me commit hua ingest ka
+    # dirty mark hum galti se clear na kar dein
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        if start is None:
+            cur.execute("SELECT date FROM group_rollup_dirty ORDER BY date")
+        else:
+            cur.execute(
+                "SELECT date FROM group_rollup_dirty WHERE date BETWEEN ? AND ? ORDER BY date",
+                (start, end),
+            )
+        dates = [row[0] for row in cur.fetchall()]
+        if not dates:
+            conn.rollback()
+            return []
+
+        where, params = _date_filter(dates, "r.date")
+        cur.execute(f"DELETE FROM daily_group_rollup {_date_filter(dates)[0]}", params)
+        for dimension, column in GROUP_DIMENSIONS.items():
+            cur.execute(
+                f"""
+                INSERT INTO daily_group_rollup (
+                    date, dimension, group_value,
+                    active_seconds, idle_seconds, suspicious_count, intervals, employees
+                )
+                SELECT
+                    r.date, ?, COALESCE(e.{column}, '') AS group_value,
+                    SUM(r.active_seconds), SUM(r.idle_seconds),
+                    SUM(r.suspicious_count), SUM(r.intervals), COUNT(*)
+                FROM daily_activity_rollup r
+                JOIN employees e ON e.employee_id = r.employee_id
+                {where}
+                GROUP BY r.date, group_value
+                """,
+                [dimension, *params],
+            )
+        cur.execute(f"DELETE FROM group_rollup_dirty {_date_filter(dates)[0]}", params)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return dates
+
+
+# ========= RETENTION / ARCHIVE =========
+#
+# Purane raw logs: rollups raw se refresh -> month ki zip me ek NDJSON member
+# per date -> live DB se delete -> incremental vacuum. Har step idempotent hai,
+# isliye beech me ruka hua job dobara chalane pe wahi se continue karta hai:
+#   - member ka naam `<date>.<max_log_id>.ndjson` hai, rerun pe same rows =
+#     same naam -> dobara nahi likha jaata; baad me aaye late rows ka naya member
+#   - delete sirf `id <= max_log_id` wali rows ka hota hai
+#   - zip pehle .tmp me likhi jaati hai phir os.replace (half-written zip nahi)
+
+def archived_dates(cur, dates: list[str]) -> set[str]:
+    if not dates:
+        return set()
+    cur.execute(
+        f"SELECT date FROM archived_days WHERE date IN ({', '.join('?' for _ in dates)})",
+        list(dates),
+    )
+    return {row[0] for row in cur.fetchall()}
+
+
+# archive rows me app strings decoded rehte hain (apps table ke bina padh sako)
+ARCHIVE_ACTIVITY_COLUMNS = """
+    a.id, a.employee_id, a.date, a.timestamp,
+    a.active_seconds, a.idle_seconds, a.suspicious,
+    p.exe AS active_app_exe, p.title AS active_app_title,
+    a.keypresses, a.mouse_clicks, a.mouse_moves, a.scrolls, a.window_changes
+"""
+
+
+def _write_ndjson_member(zf: zipfile.ZipFile, member: str, cur):
+    columns = [c[0] for c in cur.description]
+    with zf.open(member, "w") as out:
+        while True:
+            rows = cur.fetchmany(1000)
+            if not rows:
+                break
+            out.write(
+                "".join(json.dumps(dict(zip(columns, row))) + "\n" for row in rows).encode("utf-8")
+            )
+
+
+def _write_archive_month(conn, path: str, day_ranges: list[tuple[str, int]]) -> list[str]:
+    """(date, max_id) wale raw rows zip me daalo; naye member names return."""
+    tmp_path = path + ".tmp"
+    if os.path.exists(path):
+        shutil.copyfile(path, tmp_path)
+    elif os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    written = []
+    with zipfile.ZipFile(tmp_path, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+        existing = set(zf.namelist())
+        for day, max_id in day_ranges:
+            member = f"{day}.{max_id}.ndjson"
+            if member in existing:
+                continue
+
+            cur = conn.cursor()
+            cur.execute(
+                f"""
+                SELECT {ARCHIVE_ACTIVITY_COLUMNS}
+                FROM activity_logs a
+                LEFT JOIN apps p ON p.app_id = a.app_id
+                WHERE a.date = ? AND a.id <= ?
+                ORDER BY a.id
+                """,
+                (day, max_id),
+            )
+            _write_ndjson_member(zf, member, cur)
+            written.append(member)
+
+            # child tables, app strings decode karke (archive self-contained rahe)
+            cur.execute(
+                """
+                SELECT u.activity_id, u.employee_id, u.date, p.exe AS app_exe, p.title AS app_title,
+                       u.duration_ms, u.end_time
+                FROM app_usage u
+                JOIN apps p ON p.app_id = u.app_id
+                WHERE u.date = ? AND u.activity_id <= ?
+                ORDER BY u.activity_id
+                """,
+                (day, max_id),
+            )
+            _write_ndjson_member(zf, f"{day}.{max_id}.app_usage.ndjson", cur)
+            cur.execute(
+                "SELECT * FROM suspicious_events WHERE date = ? AND activity_id <= ? ORDER BY id",
+                (day, max_id),
+            )
+            _write_ndjson_member(zf, f"{day}.{max_id}.suspicious_events.ndjson", cur)
+
+    os.replace(tmp_path, path)
+    return written
+
+
+def incremental_vacuum(conn) -> int | None:
+    """
+    Deletes ke free pages file se hatao; kitne pages free hue wo return.
+    Sirf auto_vacuum=INCREMENTAL DB pe (warna None): full VACUUM poore DB ko
+    lock karta hai aur server ke andar kabhi nahi chalta.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return None
+    before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    # pragma har step pe ek page free karta hai; conn.execute() sirf pehla
+    # step chalata hai, executescript() statement ko poora khatam karta hai
+    conn.executescript("PRAGMA incremental_vacuum;")
+    after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return before - after
+
+
+def enable_incremental_vacuum(conn) -> bool:
+    """
+    Existing DB ko auto_vacuum=INCREMENTAL pe convert karo (full VACUUM:
+    poora DB rewrite, writers tab tak blocked). Sirf manage.py se, server
+    band karke. Already INCREMENTAL ho to False.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return False
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+
+def run_retention(
+    conn,
+    retention_days: int = RETENTION_DAYS,
+    archive_dir: str = ARCHIVE_DIR,
+    today: date | None = None,
+) -> dict:
+    """
+    retention_days se purane raw logs archive + delete karo.
+    conn dedicated (non-pooled) hona chahiye, job lamba chal sakta hai.
+    """
+    today = today or date.today()
+    cutoff = (today - timedelta(days=retention_days)).isoformat()
+    os.makedirs(archive_dir, exist_ok=True)
+
+    cur = conn.cursor()
+    cur.execute(
         """
+        SELECT date, MAX(id) AS max_id
+        FROM activity_logs
+        WHERE date < ?
+        GROUP BY date
+        ORDER BY date
+        """,
+        (cutoff,),
     )
+    due = [(row[0], row[1]) for row in cur.fetchall()]
+
+    by_month: dict[str, list[tuple[str, int]]] = {}
+    for day, max_id in due:
+        by_month.setdefault(day[:7], []).append((day, max_id))
+
+    summary = {
+        "cutoff": cutoff,
+        "dates": 0,
+        "rows_archived": 0,
+        "archive_files": [],
+        "vacuumed": False,
+        "pages_freed": None,
+    }
+
+    # rollups ingest pe hi update hote hain, yahan rebuild nahi: poore month
+    # ka rebuild ek lamba write transaction hai jo ingest ko busy_timeout tak
+    # rok deta. Doubt ho to pehle `manage.py rebuild-rollups --date ...`.
+    for month, day_ranges in by_month.items():
+        path = os.path.join(archive_dir, f"activity_{month}.zip")
+        _write_archive_month(conn, path, day_ranges)
+        summary["archive_files"].append(path)
+
+        for day, max_id in day_ranges:
+            cur.execute("BEGIN")
+            try:
+                for table in DETAIL_TABLES:
+                    cur.execute(
+                        f"DELETE FROM {table} WHERE date = ? AND activity_id <= ?",
+                        (day, max_id),
+                    )
+                cur.execute(
+                    "DELETE FROM activity_logs WHERE date = ? AND id <= ?",
+                    (day, max_id),
+                )
+                deleted = cur.rowcount
+                cur.execute(
+                    """
+                    INSERT INTO archived_days (date, archive_file, rows_archived, archived_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (date) DO UPDATE SET
+                        archive_file = excluded.archive_file,
+                        rows_archived = rows_archived + excluded.rows_archived,
+                        archived_at = excluded.archived_at
+                    """,
+                    (day, os.path.basename(path), deleted, datetime.utcnow().isoformat()),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            data_versions.bump_dates([day])
+            summary["dates"] += 1
+            summary["rows_archived"] += deleted
+
+    if due:
+        freed = incremental_vacuum(conn)
+        summary["pages_freed"] = freed
+        summary["vacuumed"] = bool(freed)
+
+    return summary
+
+
+class RetentionScheduler:
+    """Har `interval_hours` me run_retention, apne thread + connection pe."""
+
+    def __init__(self, interval_hours: float):
+        self.interval_seconds = interval_hours * 3600
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="nagster-retention", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            conn = get_connection()
+            try:
+                result = run_retention(conn)
+                print("✅ Retention run:", result)
+            except Exception as e:
+                print("❌ Retention run failed:", repr(e))
+            finally:
+                conn.close()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+retention_scheduler = (
+    RetentionScheduler(RETENTION_INTERVAL_HOURS) if RETENTION_INTERVAL_HOURS > 0 else None
+)
+
+
+# ========= LIVE FEED HUB =========
+
+LIVE_MAX_SUBSCRIBERS = int(os.environ.get("NAGSTER_LIVE_MAX_SUBSCRIBERS", "1000"))
+LIVE_SUBSCRIBER_QUEUE = 1000  # slow subscriber: purane events drop honge
+LIVE_HEARTBEAT_SECONDS = 15
+LIVE_INACTIVE_AFTER_SECONDS = 60  # /overview jaisa: itni der koi log nahi -> Inactive
+
+
+class LiveSubscriber:
+    def __init__(self, department: str | None, manager: str | None):
+        self.department = department
+        self.manager = manager
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=LIVE_SUBSCRIBER_QUEUE)
+        self.dropped = 0
+
+    def wants(self, event: dict) -> bool:
+        if self.department and event.get("department") != self.department:
+            return False
+        if self.manager and event.get("manager_name") != self.manager:
+            return False
+        return True
+
+
+class LiveHub:
+    """
+    Ingest -> /live subscribers fan-out.
+
+    publish_*() kisi bhi thread se call ho sakte hain (ingest threadpool /
+    queue writer); actual fan-out event loop pe hota hai, isliye subscribers
+    set aur last_seen sirf loop thread se touch hote hain (no locks).
+    Har subscriber ki bounded queue hai; slow client ke purane events drop.
+    """
+
+    def __init__(self):
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.subscribers: set[LiveSubscriber] = set()
+        self.last_seen: dict[str, float] = {}  # employee_id -> monotonic
+        self.published = 0
+        self._sweeper = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self._sweeper = loop.create_task(self._sweep_inactive())
+
+    def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        self.loop = None
+
+    def has_subscribers(self) -> bool:
+        return bool(self.subscribers)
+
+    def subscribe(self, department: str | None, manager: str | None) -> LiveSubscriber:
+        sub = LiveSubscriber(department, manager)
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: LiveSubscriber):
+        self.subscribers.discard(sub)
+
+    def active_employees(self) -> list[str]:
+        return sorted(self.last_seen)
+
+    def publish_intervals(self, logs: List[ActivityLog], day_totals: dict):
+        """Ingest commit ke baad: per-interval deltas (+ day totals agar mile)."""
+        loop = self.loop
+        if loop is None:
+            return
+        events = []
+        for log in logs:
+            info = employee_registry.info(log.employee_id) or {}
+            events.append(
+                {
+                    "type": "interval",
+                    "employee_id": log.employee_id,
+                    "name": info.get("name"),
+                    "department": info.get("department"),
+                    "manager_name": info.get("manager_name"),
+                    "timestamp": log.timestamp.isoformat(),
+                    "active_seconds": log.active_seconds,
+                    "idle_seconds": log.idle_seconds,
+                    "suspicious": log.suspicious,
+                    "active_app_exe": log.active_app_exe,
+                    "day_totals": day_totals.get((log.employee_id, log.timestamp.date().isoformat())),
+                }
+            )
+        try:
+            loop.call_soon_threadsafe(self._on_intervals, events)
+        except RuntimeError:
+            pass  # loop band ho chuka (shutdown)
+
+    def _on_intervals(self, events: list[dict]):
+        now = time.monotonic()
+        out = []
+        for event in events:
+            emp_id = event["employee_id"]
+            if emp_id not in self.last_seen:
+                out.append(self.status_event(emp_id, "Active"))
+            self.last_seen[emp_id] = now
+            out.append(event)
+            if event["suspicious"]:
+                out.append({**event, "type": "suspicious"})
+        self._fan_out(out)
+
+    def status_event(self, emp_id: str, status: str) -> dict:
+        """Status change ka SSE event (employee metadata ke saath); /live snapshot bhi yahi use karta hai."""
+        info = employee_registry.info(emp_id) or {}
+        return {
+            "type": "status",
+            "employee_id": emp_id,
+            "name": info.get("name"),
+            "department": info.get("department"),
+            "manager_name": info.get("manager_name"),
+            "status": status,
+        }
+
+    def _fan_out(self, events: list[dict]):
+        self.published += len(events)
+        for sub in self.subscribers:
+            for event in events:
+                if not sub.wants(event):
+                    continue
+                if sub.queue.full():
+                    sub.queue.get_nowait()
+                    sub.dropped += 1
+                sub.queue.put_nowait(event)
+
+    async def _sweep_inactive(self):
+        while True:
+            await asyncio.sleep(5)
+            cutoff = time.monotonic() - LIVE_INACTIVE_AFTER_SECONDS
+            gone = [emp_id for emp_id, seen in self.last_seen.items() if seen < cutoff]
+            for emp_id in gone:
+                del self.last_seen[emp_id]
+            if gone:
+                self._fan_out([self.status_event(emp_id, "Inactive") for emp_id in gone])
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            "active_employees": len(self.last_seen),
+            "published": self.published,
+            "dropped": sum(sub.dropped for sub in self.subscribers),
+        }
+
+
+live_hub = LiveHub()
+
+
+def read_day_totals(cur, keys: set[tuple[str, str]]) -> dict:
+    """(employee_id, date) -> daily rollup totals, /live events ke liye."""
+    totals = {}
+    keys = list(keys)
+    for i in range(0, len(keys), 400):
+        chunk = keys[i:i + 400]
+        cur.execute(
+            f"""
+            SELECT employee_id, date, active_seconds, idle_seconds, suspicious_count, intervals
+            FROM daily_activity_rollup
+            WHERE (employee_id, date) IN (VALUES {', '.join('(?, ?)' for _ in chunk)})
+            """,
+            [v for key in chunk for v in key],
+        )
+        for row in cur.fetchall():
+            totals[(row["employee_id"], row["date"])] = {
+                "active_seconds": row["active_seconds"],
+                "idle_seconds": row["idle_seconds"],
+                "suspicious_count": row["suspicious_count"],
+                "intervals": row["intervals"],
+            }
+    return totals
+
+
+# ========= SCHEMA MIGRATIONS =========
+#
+# Har migration = (version, description, steps). Step ya to SQL string hai
+# ya callable(cur). Startup pe schema_version se aage wali saari migrations
+# order me chalti hain, har ek apni transaction me. Naya schema change =
+# list ke end me naya version, purane versions kabhi edit mat karo.
+
+MIGRATIONS = [
+    (
+        1,
+        "base schema: activity_logs, employees, users",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS activity_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                employee_id TEXT NOT NULL,
+                date TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                active_seconds INTEGER NOT NULL,
+                idle_seconds INTEGER NOT NULL,
+                suspicious INTEGER NOT NULL,
+                active_app_exe TEXT,
+                active_app_title TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS employees (
+                employee_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                email TEXT,
+                phone TEXT,
+                designation TEXT,
+                domain TEXT,
+                department TEXT,
+                location TEXT,
+                work_mode TEXT,
+                employee_type TEXT,
+                salary_band TEXT,
+                joining_date TEXT,
+                manager_name TEXT,
+                manager_email TEXT,
+                status TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                role TEXT NOT NULL
+            )
+            """,
+        ],
+    ),
+    (
+        2,
+        "activity_logs indexes for /summary, /activity and /overview",
+        [
+            # /summary + /activity: WHERE employee_id = ? AND date = ? ORDER BY timestamp
+            """
+            CREATE INDEX IF NOT EXISTS idx_activity_logs_emp_date_ts
+            ON activity_logs (employee_id, date, timestamp)
+            """,
+            # /overview: WHERE date = ? GROUP BY employee_id, covering (no table lookups)
+            """
+            CREATE INDEX IF NOT EXISTS idx_activity_logs_date_emp
+            ON activity_logs (
+                date, employee_id, timestamp,
+                active_seconds, idle_seconds, suspicious
+            )
+            """,
+        ],
+    ),
+    (
+        3,
+        "daily_activity_rollup for /overview and /summary",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS daily_activity_rollup (
+                employee_id TEXT NOT NULL,
+                date TEXT NOT NULL,
+                first_timestamp TEXT NOT NULL,
+                last_timestamp TEXT NOT NULL,
+                active_seconds INTEGER NOT NULL DEFAULT 0,
+                idle_seconds INTEGER NOT NULL DEFAULT 0,
+                suspicious_count INTEGER NOT NULL DEFAULT 0,
+                intervals INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (employee_id, date)
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_daily_rollup_date
+            ON daily_activity_rollup (date, employee_id)
+            """,
+            lambda cur: rebuild_daily_rollup(cur),
+        ],
+    ),
+    (
+        4,
+        "15-minute and hourly timeline rollups",
+        [
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                employee_id TEXT NOT NULL,
+                date TEXT NOT NULL,
+                bucket_start TEXT NOT NULL,
+                active_seconds INTEGER NOT NULL DEFAULT 0,
+                idle_seconds INTEGER NOT NULL DEFAULT 0,
+                suspicious_count INTEGER NOT NULL DEFAULT 0,
+                intervals INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (employee_id, date, bucket_start)
+            ) WITHOUT ROWID
+            """
+            for table in ("activity_rollup_15m", "activity_rollup_hourly")
+        ]
+        + [
+            lambda cur: rebuild_bucket_rollup(cur, "activity_rollup_15m", 15),
+            lambda cur: rebuild_bucket_rollup(cur, "activity_rollup_hourly", 60),
+        ],
+    ),
+    (
+        5,
+        "archived_days: retention job progress",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS archived_days (
+                date TEXT PRIMARY KEY,
+                archive_file TEXT NOT NULL,
+                rows_archived INTEGER NOT NULL,
+                archived_at TEXT NOT NULL
+            )
+            """,
+        ],
+    ),
+    (
+        6,
+        "interval counters, apps dictionary, app_usage and suspicious_events",
+        [
+            f"ALTER TABLE activity_logs ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+            for column in ("keypresses", "mouse_clicks", "mouse_moves", "scrolls", "window_changes")
+        ]
+        + [
+            """
+            CREATE TABLE IF NOT EXISTS apps (
+                app_id INTEGER PRIMARY KEY,
+                exe TEXT NOT NULL,
+                title TEXT NOT NULL,
+                UNIQUE (exe, title)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS app_usage (
+                activity_id INTEGER NOT NULL,
+                employee_id TEXT NOT NULL,
+                date TEXT NOT NULL,
+                app_id INTEGER NOT NULL,
+                duration_ms INTEGER NOT NULL,
+                end_time TEXT
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_app_usage_date_emp
+            ON app_usage (date, employee_id)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS suspicious_events (
+                id INTEGER PRIMARY KEY,
+                activity_id INTEGER NOT NULL,
+                employee_id TEXT NOT NULL,
+                date TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                reason TEXT,
+                key TEXT,
+                details TEXT
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_suspicious_events_date_emp
+            ON suspicious_events (date, employee_id)
+            """,
+        ],
+    ),
+    (
+        7,
+        "activity_logs.app_id: dictionary-encoded active app",
+        [
+            "ALTER TABLE activity_logs ADD COLUMN app_id INTEGER",
+            """
+            INSERT OR IGNORE INTO apps (exe, title)
+            SELECT DISTINCT COALESCE(active_app_exe, ''), COALESCE(active_app_title, '')
+            FROM activity_logs
+            WHERE active_app_exe IS NOT NULL OR active_app_title IS NOT NULL
+            """,
+            """
+            UPDATE activity_logs SET app_id = p.app_id
+            FROM apps p
+            WHERE p.exe = COALESCE(activity_logs.active_app_exe, '')
+              AND p.title = COALESCE(activity_logs.active_app_title, '')
+              AND (activity_logs.active_app_exe IS NOT NULL OR activity_logs.active_app_title IS NOT NULL)
+            """,
+            # legacy string columns NULL karte hain, DROP nahi: DROP COLUMN poori
+            # activity_logs table rewrite karta hai (sabse badi table, startup
+            # migration me exclusive lock = ingest ruka). Trailing NULLs ka cost
+            # ~1 byte/row hai; nayi rows me ye columns kabhi bharte nahi.
+            """
+            UPDATE activity_logs SET active_app_exe = NULL, active_app_title = NULL
+            WHERE active_app_exe IS NOT NULL OR active_app_title IS NOT NULL
+            """,
+        ],
+    ),
+    (
+        8,
+        "partial index on suspicious intervals for /suspicious",
+        [
+            # suspicious rows <1% hain: index chhota, /suspicious baaki table touch nahi karta
+            """
+            CREATE INDEX IF NOT EXISTS idx_activity_logs_suspicious
+            ON activity_logs (timestamp)
+            WHERE suspicious = 1
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_suspicious_events_activity
+            ON suspicious_events (activity_id)
+            """,
+        ],
+    ),
+    (
+        9,
+        "daily_app_rollup for /analytics/top-apps",
+        [
+            # app_id = exe-level apps row (title '')
+            """
+            CREATE TABLE IF NOT EXISTS daily_app_rollup (
+                date TEXT NOT NULL,
+                employee_id TEXT NOT NULL,
+                app_id INTEGER NOT NULL,
+                active_seconds INTEGER NOT NULL DEFAULT 0,
+                intervals INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (date, employee_id, app_id)
+            ) WITHOUT ROWID
+            """,
+            lambda cur: rebuild_app_rollup(cur),
+        ],
+    ),
+    (
+        10,
+        "daily_group_rollup for /analytics/groups",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS daily_group_rollup (
+                date TEXT NOT NULL,
+                dimension TEXT NOT NULL,
+                group_value TEXT NOT NULL,
+                active_seconds INTEGER NOT NULL DEFAULT 0,
+                idle_seconds INTEGER NOT NULL DEFAULT 0,
+                suspicious_count INTEGER NOT NULL DEFAULT 0,
+                intervals INTEGER NOT NULL DEFAULT 0,
+                employees INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimension, date, group_value)
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS group_rollup_dirty (
+                date TEXT PRIMARY KEY
+            ) WITHOUT ROWID
+            """,
+            # backfill lazy: pehli /analytics/groups read pe
+            """
+            INSERT OR IGNORE INTO group_rollup_dirty (date)
+            SELECT DISTINCT date FROM daily_activity_rollup
+            """,
+        ],
+    ),
+]
+
 
+def current_schema_version(conn) -> int:
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def run_migrations(conn) -> list[int]:
+    """Pending migrations apply karo, applied versions return karta hai."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
     conn.commit()
-    conn.close()
+
+    applied = []
+    current = current_schema_version(conn)
+
+    for version, description, steps in MIGRATIONS:
+        if version <= current:
+            continue
+
+        cur = conn.cursor()
+        # IMMEDIATE: write lock pehle lo, phir version dobara padho. Kai uvicorn
+        # workers saath start hon to ek hi migration apply karta hai, baaki
+        # lock ke baad dekhte hain ki ho chuki hai aur skip karte hain.
+        cur.execute("BEGIN IMMEDIATE")
+        current = current_schema_version(conn)
+        if version <= current:
+            conn.rollback()
+            continue
+        try:
+            for step in steps:
+                if callable(step):
+                    step(cur)
+                else:
+                    cur.execute(step)
+            cur.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.utcnow().isoformat()),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        print(f"✅ Applied migration {version}: {description}")
+        applied.append(version)
+
+    return applied
+
+
+def init_db(conn):
+    run_migrations(conn)
+
+
+# ========= WRITE-BEHIND INGEST QUEUE =========
+
+def is_db_busy(error: Exception) -> bool:
+    """SQLite lock contention (busy_timeout khatam): transient, retry karo."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def is_row_error(error: Exception) -> bool:
+    """Batch ki kisi row ki wajah se fail (constraint / kharab value): retry se kuch nahi badlega."""
+    return isinstance(error, (sqlite3.IntegrityError, sqlite3.DataError, sqlite3.InterfaceError, ValueError, TypeError))
+
+
+class IngestQueue:
+    """
+    Bounded in-process queue + ek background writer thread.
+
+    Producers (/activity routes) `offer()` karte hain; writer har
+    `flush_rows` rows ya `flush_ms` milliseconds (jo pehle ho) pe ek
+    transaction me flush karta hai. Queue full ho to offer() False deta hai
+    (route 429 bhejta hai). stop() bachi hui saari rows flush karke hi
+    return karta hai, isliye graceful shutdown pe acknowledged data lost
+    nahi hota.
+
+    Flush fail hone pe:
+      - "database is locked/busy": wahi batch backoff ke saath retry hota
+        rehta hai (rows 202 ho chuki hain, inhe chhodna nahi hai)
+      - IntegrityError / data error: batch me koi row kharab hai -> row-by-row
+        store, jo rows fail hon wo `dead_letter_path` me
+      - baaki errors: `max_attempts` tak retry, phir poora batch dead-letter
+    Ek poison row poori queue ko hamesha ke liye block nahi karti. Dead-letter
+    file `python manage.py replay-dead-letter` se wapas DB me jaati hai.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        max_rows: int,
+        flush_rows: int,
+        flush_ms: int,
+        max_attempts: int = INGEST_FLUSH_MAX_ATTEMPTS,
+        dead_letter_path: str = INGEST_DEAD_LETTER_PATH,
+    ):
+        self.pool = pool
+        self.max_rows = max_rows
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_ms / 1000
+        self.max_attempts = max(max_attempts, 1)
+        self.dead_letter_path = dead_letter_path
+
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dead_lettered = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="nagster-ingest-writer", daemon=True)
+        self._thread.start()
+
+    def offer(self, logs: List[ActivityLog]) -> bool:
+        """Saari rows enqueue (all-or-nothing). False = queue full."""
+        with self._cond:
+            if self._stopping or len(self._pending) + len(logs) > self.max_rows:
+                self.rejected += len(logs)
+                return False
+            self._pending.extend(logs)
+            self.enqueued += len(logs)
+            # writer ya to idle hai ya batch bharne ka wait kar raha hai
+            self._cond.notify()
+        return True
+
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def _take_batch(self) -> List[ActivityLog]:
+        """Writer thread: flush condition tak wait karo, phir ek batch nikalo."""
+        with self._cond:
+            while not self._pending and not self._stopping:
+                self._cond.wait()
+
+            # pehli row aa gayi; ab flush_rows bharne ya flush_ms tak ruko
+            deadline = time.monotonic() + self.flush_seconds
+            while len(self._pending) < self.flush_rows and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            n = min(len(self._pending), self.flush_rows)
+            return [self._pending.popleft() for _ in range(n)]
+
+    def _flush(self, batch: List[ActivityLog]):
+        started = time.perf_counter()
+        with self.pool.connection() as conn:
+            store_activity_logs(conn, batch)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.flushes += 1
+        self.flushed += len(batch)
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                if self._stopping:
+                    return
+                continue
+
+            self._flush_with_retry(batch)
+
+    def _flush_with_retry(self, batch: List[ActivityLog]):
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self._flush(batch)
+                return
+            except Exception as e:
+                self.failed_flushes += 1
+                print(f"❌ Ingest flush failed (attempt {attempt}):", repr(e))
+                if is_row_error(e):
+                    break
+                # lock/busy: retention, manage.py ya doosra worker likh raha
+                # hai -> ruk ke dobara, jab tak shutdown na ho. Baaki errors
+                # bounded (0.5 + 1 + 2 + 4 s default), naye rows peeche 429 tak
+                # jamaa hote rehte hain.
+                give_up = self._stopping if is_db_busy(e) else attempt >= self.max_attempts
+                if give_up:
+                    self._dead_letter([(log, e) for log in batch])
+                    return
+                time.sleep(min(0.5 * 2 ** (attempt - 1), 5))
+
+        # batch me koi ek row kharab hai: baaki rows bachao
+        failed = []
+        for log in batch:
+            try:
+                self._flush([log])
+            except Exception as e:
+                failed.append((log, e))
+        if failed:
+            self._dead_letter(failed)
+
+    def _dead_letter(self, failed: list):
+        """Na store ho paayi rows NDJSON me, baad me jaanch / replay ke liye."""
+        now = datetime.utcnow().isoformat()
+        try:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                for log, error in failed:
+                    f.write(json.dumps({
+                        "failed_at": now,
+                        "error": repr(error),
+                        "log": log.model_dump(mode="json"),
+                    }) + "\n")
+            print(f"❌ {len(failed)} ingest rows dead-lettered to {os.path.abspath(self.dead_letter_path)}")
+        except OSError as e:
+            print(f"❌ {len(failed)} ingest rows dropped, dead-letter write failed:", repr(e))
+        self.dead_lettered += len(failed)
+
+    def stop(self, timeout: float | None = 30):
+        """Naye offers band, pending rows flush, writer thread join."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._pending:
+            print(f"❌ Ingest queue stopped with {len(self._pending)} unflushed rows")
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth(),
+            "max_rows": self.max_rows,
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "dead_lettered": self.dead_lettered,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+        }
+
+
+ingest_queue = (
+    IngestQueue(db_pool, INGEST_QUEUE_MAX_ROWS, INGEST_FLUSH_ROWS, INGEST_FLUSH_MS)
+    if INGEST_MODE == "queue"
+    else None
+)
+
+
+# ========= INGEST RATE LIMIT =========
+
+class IngestRateLimiter:
+    """
+    employee_id -> token bucket. Har request jisme employee ka interval ho,
+    us employee ka ek token leti hai (batch me kai employees ho to sabka ek
+    ek). Misconfigured agent (bahut chhota send interval, tight retry loop)
+    sirf apna bucket khaali karta hai, baaki fleet ka ingest nahi.
+    """
+
+    PRUNE_EVERY = 4096  # itni acquire() calls pe full buckets bhool jao
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60.0  # tokens per second
+        self.burst = max(burst, 1)
+        self._buckets: dict[str, tuple[float, float]] = {}  # emp -> (tokens, last refill)
+        self._lock = threading.Lock()
+        self._calls = 0
+        self.limited = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _tokens(self, emp_id: str, now: float) -> float:
+        tokens, last = self._buckets.get(emp_id, (self.burst, now))
+        return min(self.burst, tokens + (now - last) * self.rate)
+
+    def acquire(self, emp_ids: set[str]) -> float:
+        """
+        Sabke paas token ho to sabka ek consume karke 0 return; warna kuch
+        consume nahi hota aur seconds return jitni der baad retry karna hai.
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels = {emp_id: self._tokens(emp_id, now) for emp_id in emp_ids}
+            short = max((1 - t for t in levels.values()), default=0)
+            if short > 0:
+                self.limited += 1
+                return short / self.rate
+
+            for emp_id, tokens in levels.items():
+                self._buckets[emp_id] = (tokens - 1, now)
+
+            self._calls += 1
+            if self._calls % self.PRUNE_EVERY == 0:
+                self._prune(now)
+        return 0.0
+
+    def release(self, emp_ids: set[str]):
+        """
+        acquire() ke tokens wapas (burst tak). Request rate limit ke baad kisi
+        aur wajah se reject ho (queue full) to employee ka token na jaaye.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for emp_id in emp_ids:
+                tokens = self._tokens(emp_id, now)
+                self._buckets[emp_id] = (min(self.burst, tokens + 1), now)
+
+    def _prune(self, now: float):
+        full = [emp for emp in self._buckets if self._tokens(emp, now) >= self.burst]
+        for emp_id in full:
+            del self._buckets[emp_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            tracked = len(self._buckets)
+        return {
+            "per_minute": self.rate * 60,
+            "burst": self.burst,
+            "tracked_employees": tracked,
+            "limited_requests": self.limited,
+        }
+
+
+ingest_limiter = IngestRateLimiter(INGEST_RATE_PER_MINUTE, INGEST_RATE_BURST)
+
+
+def rate_limit_or_429(emp_ids: set[str], route: str):
+    if not ingest_limiter.enabled:
+        return
+    wait = ingest_limiter.acquire(emp_ids)
+    if wait > 0:
+        INGEST_RATE_LIMITED.inc((route,))
+        raise HTTPException(
+            status_code=429,
+            detail="Too many ingest requests for this employee, retry later",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+
+def enqueue_or_429(logs: List[ActivityLog]):
+    if not ingest_queue.offer(logs):
+        # rate_limit_or_429 pehle token le chuka hai; queue full server ki
+        # wajah se hai, employee ki nahi -> token wapas
+        if ingest_limiter.enabled:
+            ingest_limiter.release({log.employee_id for log in logs})
+        raise HTTPException(
+            status_code=429,
+            detail="Ingest queue full, retry later",
+            headers={"Retry-After": str(INGEST_RETRY_AFTER_SECONDS)},
+        )
 
 
 @app.on_event("startup")
 def on_startup():
-    init_db()
-    print("✅ SQLite DB ready at", os.path.abspath(DB_PATH))
+    journal_mode = configure_database()
+    with db_pool.connection() as conn:
+        init_db(conn)
+        employee_registry.load(conn)
+    print("✅ SQLite DB ready at", os.path.abspath(DB_PATH), f"(journal_mode={journal_mode})")
+
+    if ingest_queue is not None:
+        ingest_queue.start()
+        print("✅ Write-behind ingest queue started")
+
+    if retention_scheduler is not None:
+        retention_scheduler.start()
+        print(f"✅ Retention job scheduled every {RETENTION_INTERVAL_HOURS}h ({RETENTION_DAYS} days raw)")
+
+
+@app.on_event("startup")
+async def start_live_hub():
+    live_hub.start(asyncio.get_running_loop())
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    live_hub.stop()
+    if retention_scheduler is not None:
+        retention_scheduler.stop()
+    if ingest_queue is not None:
+        ingest_queue.stop()
+    adb.shutdown()
+    db_pool.close_all()
+
+
+# ========== QUERY PARAM HELPERS ==========
+
+MAX_PAGE_SIZE = 5000
+
+
+def parse_fields(fields: str | None, allowed) -> list[str] | None:
+    """?fields=a,b,c -> ['a', 'b', 'c'] (None = saare fields). Unknown -> 400."""
+    if not fields:
+        return None
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(allowed)})",
+        )
+    return wanted
+
+
+def check_limit(limit: int | None):
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+
+def check_cursor(after_timestamp: str | None, after_id: int | None):
+    """Keyset cursor = (timestamp, id) dono saath; aadha cursor chupchap ignore nahi karte."""
+    if (after_timestamp is None) != (after_id is None):
+        raise HTTPException(status_code=400, detail="after_timestamp and after_id must be given together")
+
+
+def parse_date_range(from_date: str | None, to_date: str | None) -> tuple[str, str]:
+    """?from=&to= (YYYY-MM-DD) validate karo; missing from -> today, missing to -> from."""
+    try:
+        start = date.fromisoformat(from_date) if from_date else date.today()
+        end = date.fromisoformat(to_date) if to_date else start
+    except ValueError:
+        raise HTTPException(status_code=400, detail="from/to must be YYYY-MM-DD")
+    if start > end:
+        raise HTTPException(status_code=400, detail="from must be <= to")
+    return start.isoformat(), end.isoformat()
+
+
+def resolve_date_range(
+    date_str: str | None, from_date: str | None, to_date: str | None
+) -> tuple[str, str]:
+    """?from=&to= diya ho to range, warna single ?date_str= (default today)."""
+    if from_date or to_date:
+        return parse_date_range(from_date or to_date, to_date or from_date)
+    target_date = date_str or date.today().isoformat()
+    return target_date, target_date
 
 
 # ========== AUTH ROUTES ==========
 
 @app.post("/auth/signup")
-def signup(user: UserSignup):
+def signup(user: UserSignup, conn: sqlite3.Connection = Depends(get_db)):
     if user.role not in ("admin", "manager"):
         raise HTTPException(status_code=400, detail="role must be 'admin' or 'manager'")
 
-    existing = get_user_by_username(user.username)
+    existing = get_user_by_username(conn, user.username)
     if existing:
         raise HTTPException(status_code=400, detail="Username already exists")
 
-    conn = get_connection()
     cur = conn.cursor()
     cur.execute(
         """
@@ -203,15 +2435,14 @@ def signup(user: UserSignup):
         (user.username, hash_password(user.password), user.role),
     )
     conn.commit()
-    conn.close()
 
     token = create_access_token(user.username, user.role)
     return {"access_token": token, "role": user.role}
 
 
 @app.post("/auth/login")
-def login(user: UserLogin):
-    db_user = get_user_by_username(user.username)
+def login(user: UserLogin, conn: sqlite3.Connection = Depends(get_db)):
+    db_user = get_user_by_username(conn, user.username)
     if not db_user or not verify_password(user.password, db_user["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -247,67 +2478,149 @@ def health_check():
 
 
 @app.post("/activity")
-def receive_activity(log: ActivityLog):
+def receive_activity(
+    log: ActivityLog, response: Response, conn: sqlite3.Connection = Depends(get_db)
+):
     """
     Agent se single-interval summary aati hai.
     Yahan:
       1) activity_logs me insert
       2) us employee ka status = 'Active' kar dete hain
+    Queue mode me sirf validate + enqueue hota hai aur 202 milta hai.
+    Employee apni rate limit se upar ho to 429 + Retry-After.
     """
 
     # 🔴 NEW: ensure this employee is registered in DB
-    if not employee_exists(log.employee_id):
+    if not employee_exists(conn, log.employee_id):
         raise HTTPException(
             status_code=404,
             detail=f"Employee {log.employee_id} not registered in company DB",
         )
 
-    log_date = log.timestamp.date().isoformat()
+    rate_limit_or_429({log.employee_id}, "/activity")
+
+    if ingest_queue is not None:
+        enqueue_or_429([log])
+        response.status_code = 202
+        return {"message": "log queued"}
+
+    store_activity_logs(conn, [log])
+    return {"message": "log stored"}
+
+
+@app.post("/activity/batch")
+def receive_activity_batch(
+    logs: List[ActivityLog],
+    response: Response,
+    conn: sqlite3.Connection = Depends(get_db),
+):
+    """
+    Multiple intervals ek hi request me (kai employees ke bhi ho sakte hain).
+    Saare employee IDs ek query me validate hote hain aur saari rows
+    ek hi transaction me likhi jaati hain. Agar koi bhi employee unknown hai
+    to poora batch reject hota hai (kuch bhi store nahi hota); rate limit
+    pe bhi yahi: koi ek employee limit se upar -> poora batch 429.
+    """
+    if not logs:
+        return {"message": "logs stored", "count": 0}
+
+    if len(logs) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {MAX_BATCH_SIZE} logs per request)",
+        )
+
+    unknown = missing_employees(conn, {log.employee_id for log in logs})
+    if unknown:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Employees not registered in company DB: {', '.join(sorted(unknown))}",
+        )
+
+    rate_limit_or_429({log.employee_id for log in logs}, "/activity/batch")
+
+    if ingest_queue is not None:
+        enqueue_or_429(logs)
+        response.status_code = 202
+        return {"message": "logs queued", "count": len(logs)}
+
+    store_activity_logs(conn, logs)
+    return {"message": "logs stored", "count": len(logs)}
+
+
+@app.get("/ingest/stats")
+def ingest_stats():
+    """Ingest mode, queue depth / flush latency, aur DB pool stats."""
+    return {
+        "mode": INGEST_MODE,
+        "queue": ingest_queue.stats() if ingest_queue is not None else None,
+        "pool": db_pool.stats(),
+        "response_cache": response_cache.stats(),
+        "live": live_hub.stats(),
+        "rate_limit": ingest_limiter.stats() if ingest_limiter.enabled else None,
+    }
+
 
-    conn = get_connection()
-    cur = conn.cursor()
+def _db_file_sizes():
+    sizes = []
+    for suffix, kind in (("", "main"), ("-wal", "wal")):
+        try:
+            sizes.append(((kind,), os.path.getsize(DB_PATH + suffix)))
+        except OSError:
+            pass
+    return sizes
 
-    # activity log store
-    cur.execute(
-        """
-        INSERT INTO activity_logs (
-            employee_id, date, timestamp,
-            active_seconds, idle_seconds, suspicious,
-            active_app_exe, active_app_title
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            log.employee_id,
-            log_date,
-            log.timestamp.isoformat(),
-            log.active_seconds,
-            log.idle_seconds,
-            1 if log.suspicious else 0,
-            log.active_app_exe,
-            log.active_app_title,
-        ),
-    )
 
-    # jis employee ne log bheja use Active mark karo
-    cur.execute(
-        "UPDATE employees SET status = 'Active' WHERE employee_id = ?",
-        (log.employee_id,),
-    )
+def _queue_stat(key):
+    return lambda: [((), ingest_queue.stats()[key])] if ingest_queue is not None else []
 
-    conn.commit()
-    conn.close()
 
-    print("✅ Stored activity log in DB:", log.dict())
-    return {"message": "log stored"}
+metrics.gauge("nagster_db_file_bytes", "SQLite file sizes.", _db_file_sizes, ("file",))
+metrics.gauge("nagster_db_pool_connections", "Pool connections by state.", lambda: [
+    (("open",), db_pool.stats()["open"]),
+    (("idle",), db_pool.stats()["idle"]),
+    (("max",), db_pool.size),
+], ("state",))
+metrics.gauge("nagster_ingest_queue_depth", "Rows waiting in the write-behind queue.", _queue_stat("depth"))
+metrics.gauge(
+    "nagster_ingest_queue_rejected_rows_total", "Rows rejected with 429 (queue full).",
+    _queue_stat("rejected"), kind="counter",
+)
+metrics.gauge(
+    "nagster_ingest_queue_failed_flushes_total", "Writer flushes that failed and were retried.",
+    _queue_stat("failed_flushes"), kind="counter",
+)
+metrics.gauge(
+    "nagster_ingest_queue_dead_lettered_rows_total", "Rows that could not be stored after all retries.",
+    _queue_stat("dead_lettered"), kind="counter",
+)
+metrics.gauge("nagster_response_cache_entries", "Cached response bodies.", lambda: [
+    ((), response_cache.stats()["entries"]),
+])
+metrics.gauge("nagster_response_cache_bytes", "Total size of cached response bodies.", lambda: [
+    ((), response_cache.stats()["bytes"]),
+])
+metrics.gauge("nagster_response_cache_requests_total", "Response cache lookups by result.", lambda: [
+    (("hit",), response_cache.hits),
+    (("miss",), response_cache.misses),
+    (("not_modified",), response_cache.not_modified),
+], ("result",), kind="counter")
+metrics.gauge("nagster_live_subscribers", "Connected /live clients.", lambda: [
+    ((), len(live_hub.subscribers)),
+])
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus text format (scrape config me isi path ko point karo)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 # ========== EMPLOYEE CRUD ==========
 
 @app.post("/employees/add")
-def add_employee(emp: EmployeeCreate):
+def add_employee(emp: EmployeeCreate, conn: sqlite3.Connection = Depends(get_db)):
     """Add a new employee from Add Employee page."""
-    conn = get_connection()
     cur = conn.cursor()
 
     # check if exists
@@ -317,7 +2630,6 @@ def add_employee(emp: EmployeeCreate):
     )
     existing = cur.fetchone()
     if existing:
-        conn.close()
         raise HTTPException(status_code=400, detail="Employee ID already exists")
 
     cur.execute(
@@ -350,14 +2662,14 @@ def add_employee(emp: EmployeeCreate):
         ),
     )
     conn.commit()
-    conn.close()
+    employee_registry.put({**emp.dict(), "status": "Inactive"})
+    data_versions.bump_all()
     return {"message": "Employee added"}
 
 
 @app.delete("/employees/remove/{employee_id}")
-def remove_employee(employee_id: str):
+def remove_employee(employee_id: str, conn: sqlite3.Connection = Depends(get_db)):
     """Remove employee + optional logs (for Remove Employee page)."""
-    conn = get_connection()
     cur = conn.cursor()
 
     # ensure employee exists
@@ -367,7 +2679,6 @@ def remove_employee(employee_id: str):
     )
     row = cur.fetchone()
     if not row:
-        conn.close()
         raise HTTPException(status_code=404, detail="Employee not found")
 
     # delete logs first (optional but clean)
@@ -375,93 +2686,138 @@ def remove_employee(employee_id: str):
         "DELETE FROM activity_logs WHERE employee_id = ?",
         (employee_id,),
     )
+    # group rollup me iske din dobara compute honge
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO group_rollup_dirty (date)
+        SELECT date FROM daily_activity_rollup WHERE employee_id = ?
+        """,
+        (employee_id,),
+    )
+    for table in rollup_tables() + list(DETAIL_TABLES):
+        cur.execute(f"DELETE FROM {table} WHERE employee_id = ?", (employee_id,))
     # delete employee
     cur.execute(
         "DELETE FROM employees WHERE employee_id = ?",
         (employee_id,),
     )
     conn.commit()
-    conn.close()
+    employee_registry.remove(employee_id)
+    data_versions.bump_all()
     return {"message": "Employee removed"}
 
 
 @app.get("/employees")
-def list_employees(status: str | None = Query(None)):
+async def list_employees(
+    response: Response,
+    status: str | None = Query(None),
+    after_id: str | None = Query(None),
+    limit: int | None = Query(None),
+    fields: str | None = Query(None),
+):
     """
     All employees basic info.
     Optional ?status=Active or ?status=Inactive
+    Keyset pagination: ?after_id=<last employee_id>&limit=N, next cursor
+    X-Next-After-Id header me. ?fields=employee_id,name -> sirf ye columns.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-
+    check_limit(limit)
+    wanted = parse_fields(fields, EMPLOYEE_BASIC_COLUMNS)
+    rows, next_after_id = await adb.run(query_employees, status, after_id, limit, wanted)
+    if next_after_id is not None:
+        response.headers["X-Next-After-Id"] = next_after_id
+    return rows
+
+
+def query_employees(
+    conn,
+    status: str | None,
+    after_id: str | None = None,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+):
+    wanted = fields or list(EMPLOYEE_BASIC_COLUMNS)
+    columns = wanted if "employee_id" in wanted else ["employee_id", *wanted]
+
+    where, params = [], []
     if status:
-        cur.execute(
-            """
-            SELECT employee_id, name, designation, domain, department,
-                   location, work_mode, status
-            FROM employees
-            WHERE status = ?
-            ORDER BY employee_id
-            """,
-            (status,),
-        )
-    else:
-        cur.execute(
-            """
-            SELECT employee_id, name, designation, domain, department,
-                   location, work_mode, status
-            FROM employees
-            ORDER BY employee_id
-            """
-        )
+        where.append("status = ?")
+        params.append(status)
+    if after_id is not None:
+        where.append("employee_id > ?")
+        params.append(after_id)
+
+    sql = f"SELECT {', '.join(columns)} FROM employees"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY employee_id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
 
+    cur = conn.cursor()
+    cur.execute(sql, params)
     rows = cur.fetchall()
-    conn.close()
 
-    return [dict(row) for row in rows]
+    next_after_id = None
+    if limit is not None and len(rows) == limit:
+        next_after_id = rows[-1]["employee_id"]
+
+    return [{col: row[col] for col in wanted} for row in rows], next_after_id
 
 
 # 🔴 NEW: single employee fetch for agent verification
 @app.get("/employees/{employee_id}")
-def get_employee(employee_id: str):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT employee_id, name, designation, domain, department,
-               location, work_mode, status
-        FROM employees
-        WHERE employee_id = ?
-        """,
-        (employee_id,),
-    )
-    row = cur.fetchone()
-    conn.close()
-
-    if not row:
+async def get_employee(employee_id: str):
+    row = employee_registry.get(employee_id)
+    if row is not None:
+        return row
+
+    # registry miss (dusre worker me add hua?) -> DB
+    rows = await adb.run(fetch_employees_basic, {employee_id})
+    if not rows:
         raise HTTPException(status_code=404, detail="Employee not found")
 
-    return dict(row)
+    return rows[0]
 
 
 # Aliased endpoint: POST /employees
 @app.post("/employees")
-def create_employee(emp: EmployeeCreate):
+def create_employee(emp: EmployeeCreate, conn: sqlite3.Connection = Depends(get_db)):
     # Reuse existing logic
-    return add_employee(emp)
+    return add_employee(emp, conn)
 
 
 # Aliased endpoint: DELETE /employees/{employee_id}
 @app.delete("/employees/{employee_id}")
-def delete_employee(employee_id: str):
+def delete_employee(employee_id: str, conn: sqlite3.Connection = Depends(get_db)):
     # Reuse existing logic
-    return remove_employee(employee_id)
+    return remove_employee(employee_id, conn)
 
 
 # ========== OVERVIEW / SUMMARY ==========
 
 @app.get("/overview")
-def overview(date_str: str | None = Query(None)):
+async def overview(
+    request: Request,
+    date_str: str | None = Query(None),
+    from_date: str | None = Query(None, alias="from"),
+    to_date: str | None = Query(None, alias="to"),
+    breakdown: bool = Query(False),
+):
+    """
+    ?date_str= ek din, ya ?from=&to= poori range ek request me
+    (daily rollups pe SUM). ?breakdown=true -> har employee ke "days" bhi.
+    """
+    start, end = resolve_date_range(date_str, from_date, to_date)
+
+    async def build():
+        return await adb.run(query_overview, start, end, breakdown), {}
+
+    return await cached_json(request, start, end, build)
+
+
+def query_overview(conn, start: str, end: str, breakdown: bool = False):
     """
     Daily overview for all employees (for dashboard left panel).
 
@@ -470,14 +2826,8 @@ def overview(date_str: str | None = Query(None)):
       - Agar last activity N seconds se purani hai -> Inactive
       - Warna Active
     """
-    if date_str:
-        target_date = date_str
-    else:
-        target_date = date.today().isoformat()
-
     INACTIVE_AFTER_SECONDS = 60  # 60s after last log -> Inactive
 
-    conn = get_connection()
     cur = conn.cursor()
 
     cur.execute(
@@ -491,23 +2841,36 @@ def overview(date_str: str | None = Query(None)):
           e.location,
           e.work_mode,
           e.status AS db_status,
-          MIN(a.timestamp) AS login_time,
-          MAX(a.timestamp) AS logout_time,
-          COALESCE(SUM(a.active_seconds), 0) AS total_active,
-          COALESCE(SUM(a.idle_seconds), 0) AS total_idle,
-          COALESCE(SUM(a.suspicious), 0) AS total_suspicious
+          MIN(r.first_timestamp) AS login_time,
+          MAX(r.last_timestamp) AS logout_time,
+          COALESCE(SUM(r.active_seconds), 0) AS total_active,
+          COALESCE(SUM(r.idle_seconds), 0) AS total_idle,
+          COALESCE(SUM(r.suspicious_count), 0) AS total_suspicious
         FROM employees e
-        LEFT JOIN activity_logs a
-          ON e.employee_id = a.employee_id
-         AND a.date = ?
+        LEFT JOIN daily_activity_rollup r
+          ON e.employee_id = r.employee_id
+         AND r.date BETWEEN ? AND ?
         GROUP BY e.employee_id
         ORDER BY e.employee_id
         """,
-        (target_date,),
+        (start, end),
     )
 
     rows = cur.fetchall()
-    conn.close()
+
+    days_by_emp: dict[str, list] = {}
+    if breakdown:
+        for day in daily_rollup_rows(conn, start, end):
+            days_by_emp.setdefault(day["employee_id"], []).append(
+                {
+                    "date": day["date"],
+                    "login_time": day["first_timestamp"],
+                    "logout_time": day["last_timestamp"],
+                    "active_minutes": day["active_seconds"] // 60,
+                    "idle_minutes": day["idle_seconds"] // 60,
+                    "suspicious_flag_count": day["suspicious_count"],
+                }
+            )
 
     now = datetime.utcnow()
     result = []
@@ -539,54 +2902,79 @@ def overview(date_str: str | None = Query(None)):
             except Exception:
                 current_status = db_status or "Inactive"
 
-        result.append(
-            {
-                "employee_id": row["employee_id"],
-                "name": row["name"],
-                "designation": row["designation"],
-                "domain": row["domain"],
-                "department": row["department"],
-                "location": row["location"],
-                "work_mode": row["work_mode"],
-                "status": current_status,
-                "login_time": login_time,
-                "logout_time": logout_time,
-                "active_minutes": to_minutes(total_active),
-                "idle_minutes": to_minutes(total_idle),
-                "suspicious_flag_count": row["total_suspicious"],
-            }
-        )
+        item = {
+            "employee_id": row["employee_id"],
+            "name": row["name"],
+            "designation": row["designation"],
+            "domain": row["domain"],
+            "department": row["department"],
+            "location": row["location"],
+            "work_mode": row["work_mode"],
+            "status": current_status,
+            "login_time": login_time,
+            "logout_time": logout_time,
+            "active_minutes": to_minutes(total_active),
+            "idle_minutes": to_minutes(total_idle),
+            "suspicious_flag_count": row["total_suspicious"],
+        }
+        if breakdown:
+            item["days"] = days_by_emp.get(row["employee_id"], [])
+        result.append(item)
 
     return result
 
 
+def daily_rollup_rows(conn, start: str, end: str, employee_id: str | None = None):
+    """Per-(employee, day) rollup rows for a range, date order."""
+    sql = "SELECT * FROM daily_activity_rollup WHERE date BETWEEN ? AND ?"
+    params: list = [start, end]
+    if employee_id is not None:
+        sql += " AND employee_id = ?"
+        params.append(employee_id)
+    cur = conn.cursor()
+    cur.execute(sql + " ORDER BY date, employee_id", params)
+    return cur.fetchall()
+
+
 @app.get("/summary/{employee_id}")
-def get_summary(employee_id: str, date_str: str | None = Query(None)):
+async def get_summary(
+    employee_id: str,
+    request: Request,
+    date_str: str | None = Query(None),
+    from_date: str | None = Query(None, alias="from"),
+    to_date: str | None = Query(None, alias="to"),
+    breakdown: bool = Query(False),
+):
+    start, end = resolve_date_range(date_str, from_date, to_date)
+
+    async def build():
+        return await adb.run(query_summary, employee_id, start, end, breakdown), {}
+
+    return await cached_json(request, start, end, build, employee_id=employee_id)
+
+
+def query_summary(conn, employee_id: str, start: str, end: str, breakdown: bool = False):
     """
-    Detailed summary for single employee for a given day.
+    Detailed summary for single employee for a given day (ya start..end range).
     """
-    if date_str:
-        target_date = date_str
-    else:
-        target_date = date.today().isoformat()
-
-    conn = get_connection()
     cur = conn.cursor()
 
     cur.execute(
         """
         SELECT
-            COALESCE(SUM(active_seconds), 0) AS total_active,
-            COALESCE(SUM(idle_seconds), 0) AS total_idle,
-            COALESCE(SUM(suspicious), 0) AS total_suspicious,
-            MIN(timestamp) AS login_time,
-            MAX(timestamp) AS logout_time
-        FROM activity_logs
-        WHERE employee_id = ? AND date = ?
+            SUM(active_seconds) AS total_active,
+            SUM(idle_seconds) AS total_idle,
+            SUM(suspicious_count) AS total_suspicious,
+            MIN(first_timestamp) AS login_time,
+            MAX(last_timestamp) AS logout_time
+        FROM daily_activity_rollup
+        WHERE employee_id = ? AND date BETWEEN ? AND ?
         """,
-        (employee_id, target_date),
+        (employee_id, start, end),
     )
     logs_row = cur.fetchone()
+    if logs_row is not None and logs_row["total_active"] is None:
+        logs_row = None  # range me koi activity nahi
 
     cur.execute(
         """
@@ -597,7 +2985,6 @@ def get_summary(employee_id: str, date_str: str | None = Query(None)):
         (employee_id,),
     )
     emp_row = cur.fetchone()
-    conn.close()
 
     if not emp_row:
         raise HTTPException(status_code=404, detail="Employee not found")
@@ -613,9 +3000,11 @@ def get_summary(employee_id: str, date_str: str | None = Query(None)):
 
     emp = dict(emp_row)
 
-    return {
+    summary = {
         "employee_id": emp["employee_id"],
-        "date": target_date,
+        "date": start,
+        "from": start,
+        "to": end,
         "name": emp["name"],
         "email": emp["email"],
         "phone": emp["phone"],
@@ -637,16 +3026,89 @@ def get_summary(employee_id: str, date_str: str | None = Query(None)):
         "suspicious_flag_count": total_suspicious,
     }
 
+    if breakdown:
+        summary["days"] = [
+            {
+                "date": day["date"],
+                "login_time": day["first_timestamp"],
+                "logout_time": day["last_timestamp"],
+                "active": fmt_sec(day["active_seconds"]),
+                "idle": fmt_sec(day["idle_seconds"]),
+                "suspicious_flag_count": day["suspicious_count"],
+            }
+            for day in daily_rollup_rows(conn, start, end, employee_id)
+        ]
+
+    return summary
+
 
 # ========== ACTIVITY LOG LIST ==========
 
+# /activity items ke fields -> unke liye chahiye activity_logs columns
+ACTIVITY_ITEM_COLUMNS = {
+    "id": ("id",),
+    "timestamp": ("timestamp",),
+    "type": ("active_seconds", "idle_seconds", "suspicious"),
+    "title": ("app_id",),
+    "description": ("active_seconds", "idle_seconds", "app_id"),
+    "duration": ("active_seconds", "idle_seconds"),
+    "details": ("id", "keypresses", "mouse_clicks", "mouse_moves", "scrolls", "window_changes"),
+}
+
+
 @app.get("/activity/{employee_id}")
-def get_activity_logs(employee_id: str, date_str: str | None = Query(None)):
+async def get_activity_logs(
+    employee_id: str,
+    request: Request,
+    date_str: str | None = Query(None),
+    after_timestamp: str | None = Query(None),
+    after_id: int | None = Query(None),
+    since: str | None = Query(None),
+    limit: int | None = Query(None),
+    fields: str | None = Query(None),
+):
+    """
+    Keyset pagination: `limit` ke saath page full aaya to response headers
+    X-Next-After-Timestamp / X-Next-After-Id agla cursor dete hain.
+    `since` = sirf is timestamp ke baad wale rows (dashboard incremental poll).
+    """
+    check_limit(limit)
+    check_cursor(after_timestamp, after_id)
+    wanted = parse_fields(fields, ACTIVITY_ITEM_COLUMNS)
+    target_date = date_str or date.today().isoformat()
+
+    async def build():
+        logs, next_cursor = await adb.run(
+            query_activity_logs, employee_id, target_date,
+            after_timestamp, after_id, since, limit, wanted,
+        )
+        headers = {}
+        if next_cursor:
+            headers["X-Next-After-Timestamp"] = next_cursor[0]
+            headers["X-Next-After-Id"] = str(next_cursor[1])
+        return logs, headers
+
+    return await cached_json(request, target_date, target_date, build)
+
+
+def query_activity_logs(
+    conn,
+    employee_id: str,
+    date_str: str | None,
+    after_timestamp: str | None = None,
+    after_id: int | None = None,
+    since: str | None = None,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+):
     """
     Raw activity logs list for an employee for given date.
+    (Retention window se purani dates ke raw logs archive me hain -> empty list;
+    unke totals /summary aur /timeline rollups se milte hain.)
     Frontend ActivityView iss format me use karega:
       [
         {
+          "id": 123,
           "timestamp": "...",
           "type": "active/idle/suspicious",
           "title": "...",
@@ -656,80 +3118,654 @@ def get_activity_logs(employee_id: str, date_str: str | None = Query(None)):
         },
         ...
       ]
+    Returns (logs, next_cursor); next_cursor = (timestamp, id) ya None.
     """
     if date_str:
         target_date = date_str
     else:
         target_date = date.today().isoformat()
 
-    conn = get_connection()
+    # ensure employee exists
+    if not employee_exists(conn, employee_id):
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    wanted = fields or list(ACTIVITY_ITEM_COLUMNS)
+    columns = {"id", "timestamp"}  # cursor ke liye hamesha
+    for field in wanted:
+        columns.update(ACTIVITY_ITEM_COLUMNS[field])
+
+    where = ["employee_id = ?", "date = ?"]
+    params: list = [employee_id, target_date]
+    if after_timestamp is not None:
+        where.append("(timestamp > ? OR (timestamp = ? AND id > ?))")
+        params += [after_timestamp, after_timestamp, after_id]
+    if since is not None:
+        where.append("timestamp > ?")
+        params.append(since)
+
+    sql = f"""
+        SELECT {', '.join(sorted(columns))}
+        FROM activity_logs
+        WHERE {' AND '.join(where)}
+        ORDER BY timestamp ASC, id ASC
+    """
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+
     cur = conn.cursor()
+    cur.execute(sql, params)
+    rows = cur.fetchall()
 
-    # ensure employee exists
-    cur.execute(
-        "SELECT employee_id, name FROM employees WHERE employee_id = ?",
-        (employee_id,),
-    )
-    emp = cur.fetchone()
-    if not emp:
-        conn.close()
+    logs: List[dict] = []
+
+    # app_id -> strings sirf tab jab title/description maange gaye
+    app_names = {}
+    if "app_id" in columns:
+        app_names = app_dictionary.names_for(cur, {row["app_id"] for row in rows})
+
+    for row in rows:
+        keys = row.keys()
+        active = row["active_seconds"] if "active_seconds" in keys else 0
+        idle = row["idle_seconds"] if "idle_seconds" in keys else 0
+        suspicious = row["suspicious"] if "suspicious" in keys else 0
+        exe, title = app_names.get(row["app_id"], (None, None)) if "app_id" in keys else (None, None)
+
+        log_item = {}
+        for field in wanted:
+            if field == "id":
+                log_item["id"] = row["id"]
+            elif field == "timestamp":
+                log_item["timestamp"] = row["timestamp"]
+            elif field == "type":
+                if suspicious:
+                    log_item["type"] = "suspicious"
+                elif active >= idle:
+                    log_item["type"] = "active"
+                else:
+                    log_item["type"] = "idle"
+            elif field == "title":
+                log_item["title"] = title or exe or "Activity interval"
+            elif field == "description":
+                description_parts = [
+                    f"Active: {active}s",
+                    f"Idle: {idle}s",
+                ]
+                if exe or title:
+                    description_parts.append(f"App: {exe or '-'} | {title or '-'}")
+                log_item["description"] = " | ".join(description_parts)
+            elif field == "duration":
+                total_sec = (active or 0) + (idle or 0)
+                log_item["duration"] = f"{total_sec}s" if total_sec else None
+            elif field == "details":
+                log_item["details"] = (
+                    f"log_id={row['id']} | keys={row['keypresses']} clicks={row['mouse_clicks']} "
+                    f"moves={row['mouse_moves']} scrolls={row['scrolls']} "
+                    f"window_changes={row['window_changes']}"
+                )
+        logs.append(log_item)
+
+    next_cursor = None
+    if limit is not None and len(rows) == limit:
+        next_cursor = (rows[-1]["timestamp"], rows[-1]["id"])
+
+    return logs, next_cursor
+
+
+# ========== TIMELINE ==========
+
+@app.get("/timeline/{employee_id}")
+async def get_timeline(
+    employee_id: str,
+    request: Request,
+    date_str: str | None = Query(None),
+    bucket: str = Query("15m"),
+):
+    target_date = date_str or date.today().isoformat()
+
+    async def build():
+        return await adb.run(query_timeline, employee_id, target_date, bucket), {}
+
+    return await cached_json(request, target_date, target_date, build)
+
+
+def query_timeline(conn, employee_id: str, date_str: str | None, bucket: str):
+    """
+    Fixed-width day timeline (15m -> 96 buckets, 1h -> 24 buckets),
+    bucket rollup tables se. Jin buckets me koi log nahi unme zeros.
+    """
+    if bucket not in TIMELINE_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"bucket must be one of: {', '.join(TIMELINE_BUCKETS)}",
+        )
+
+    if date_str:
+        target_date = date_str
+    else:
+        target_date = date.today().isoformat()
+
+    if not employee_exists(conn, employee_id):
         raise HTTPException(status_code=404, detail="Employee not found")
 
+    table, minutes = TIMELINE_BUCKETS[bucket]
+
+    cur = conn.cursor()
     cur.execute(
-        """
-        SELECT *
-        FROM activity_logs
+        f"""
+        SELECT bucket_start, active_seconds, idle_seconds, suspicious_count, intervals
+        FROM {table}
         WHERE employee_id = ? AND date = ?
-        ORDER BY timestamp ASC
         """,
         (employee_id, target_date),
     )
+    by_start = {row["bucket_start"]: row for row in cur.fetchall()}
+
+    buckets = []
+    for i in range(24 * 60 // minutes):
+        start = f"{target_date}T{(i * minutes) // 60:02d}:{(i * minutes) % 60:02d}:00"
+        row = by_start.get(start)
+        buckets.append(
+            {
+                "bucket_start": start,
+                "active_seconds": row["active_seconds"] if row else 0,
+                "idle_seconds": row["idle_seconds"] if row else 0,
+                "suspicious_count": row["suspicious_count"] if row else 0,
+                "intervals": row["intervals"] if row else 0,
+            }
+        )
+
+    return {
+        "employee_id": employee_id,
+        "date": target_date,
+        "bucket": bucket,
+        "bucket_minutes": minutes,
+        "buckets": buckets,
+    }
+
+
+# ========== SUSPICIOUS REPORTS ==========
+
+SUSPICIOUS_DEFAULT_LIMIT = 200
+
+
+@app.get("/suspicious")
+async def get_suspicious(
+    request: Request,
+    from_date: str | None = Query(None, alias="from"),
+    to_date: str | None = Query(None, alias="to"),
+    department: str | None = Query(None),
+    employee_id: str | None = Query(None),
+    after_timestamp: str | None = Query(None),
+    after_id: int | None = Query(None),
+    limit: int = Query(SUSPICIOUS_DEFAULT_LIMIT),
+):
+    """
+    Flagged intervals (suspicious = 1) + employee metadata + agent ke
+    suspicious events, timestamp order me. Page full ho to
+    X-Next-After-Timestamp / X-Next-After-Id headers agla cursor dete hain.
+    """
+    check_limit(limit)
+    check_cursor(after_timestamp, after_id)
+    start, end = parse_date_range(from_date, to_date)
+
+    async def build():
+        items, next_cursor = await adb.run(
+            query_suspicious, start, end, department, employee_id,
+            after_timestamp, after_id, limit,
+        )
+        headers = {}
+        if next_cursor:
+            headers["X-Next-After-Timestamp"] = next_cursor[0]
+            headers["X-Next-After-Id"] = str(next_cursor[1])
+        return {"from": start, "to": end, "count": len(items), "items": items}, headers
+
+    return await cached_json(request, start, end, build)
+
+
+def query_suspicious(
+    conn,
+    start: str,
+    end: str,
+    department: str | None = None,
+    employee_id: str | None = None,
+    after_timestamp: str | None = None,
+    after_id: int | None = None,
+    limit: int = SUSPICIOUS_DEFAULT_LIMIT,
+):
+    """Returns (items, next_cursor); next_cursor = (timestamp, id) ya None."""
+    # timestamp range: idx_activity_logs_suspicious (timestamp) pe seek (saari
+    # fleet). Same range date pe bhi (date = timestamp ka din, redundant): employee_id
+    # ho to planner idx_activity_logs_emp_date_ts (employee_id, date) pe seek
+    # karta hai, warna employee ki poori history padhi jaati.
+    end_exclusive = (date.fromisoformat(end) + timedelta(days=1)).isoformat()
+    where = ["a.suspicious = 1", "a.timestamp >= ?", "a.timestamp < ?", "a.date BETWEEN ? AND ?"]
+    params: list = [start, end_exclusive, start, end]
+    if department:
+        where.append("e.department = ?")
+        params.append(department)
+    if employee_id:
+        where.append("a.employee_id = ?")
+        params.append(employee_id)
+    if after_timestamp is not None:
+        where.append("(a.timestamp, a.id) > (?, ?)")
+        params.extend([after_timestamp, after_id])
+    params.append(limit)
+
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT
+            a.id, a.employee_id, e.name, e.designation, e.domain, e.department,
+            e.location, e.manager_name, a.date, a.timestamp,
+            a.active_seconds, a.idle_seconds, a.app_id
+        FROM activity_logs a
+        JOIN employees e ON e.employee_id = a.employee_id
+        WHERE {' AND '.join(where)}
+        ORDER BY a.timestamp, a.id
+        LIMIT ?
+        """,
+        params,
+    )
     rows = cur.fetchall()
-    conn.close()
 
-    logs: List[dict] = []
+    app_names = app_dictionary.names_for(cur, {row["app_id"] for row in rows})
+
+    events: dict[int, list] = {}
+    ids = [row["id"] for row in rows]
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        cur.execute(
+            f"""
+            SELECT activity_id, timestamp, reason, key
+            FROM suspicious_events
+            WHERE activity_id IN ({', '.join('?' for _ in chunk)})
+            ORDER BY id
+            """,
+            chunk,
+        )
+        for ev in cur.fetchall():
+            events.setdefault(ev["activity_id"], []).append(
+                {"timestamp": ev["timestamp"], "reason": ev["reason"], "key": ev["key"]}
+            )
 
+    items = []
     for row in rows:
-        active = row["active_seconds"]
-        idle = row["idle_seconds"]
-        suspicious = row["suspicious"]
-        exe = row["active_app_exe"]
-        title = row["active_app_title"]
-        ts = row["timestamp"]
-
-        total_sec = (active or 0) + (idle or 0)
-
-        # type decide
-        if suspicious:
-            activity_type = "suspicious"
-        elif active >= idle:
-            activity_type = "active"
-        else:
-            activity_type = "idle"
+        exe, title = app_names.get(row["app_id"], (None, None))
+        item = {k: row[k] for k in row.keys() if k != "app_id"}
+        item["active_app_exe"] = exe
+        item["active_app_title"] = title
+        item["events"] = events.get(row["id"], [])
+        items.append(item)
+
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = (rows[-1]["timestamp"], rows[-1]["id"])
+    return items, next_cursor
+
+
+# ========== APP ANALYTICS ==========
+
+# ?by= -> group expression
+TOP_APPS_GROUPS = {
+    "employee": "r.employee_id",
+    "department": "e.department",
+    "manager": "e.manager_name",
+    "all": "'all'",
+}
+TOP_APPS_MAX = 50
+
+
+@app.get("/analytics/top-apps")
+async def top_apps(
+    request: Request,
+    by: str = Query("department"),
+    from_date: str | None = Query(None, alias="from"),
+    to_date: str | None = Query(None, alias="to"),
+    department: str | None = Query(None),
+    manager: str | None = Query(None),
+    employee_id: str | None = Query(None),
+    top: int = Query(10),
+):
+    """
+    Har group (employee / department / manager / all) ke top apps, active
+    time ke hisaab se. daily_app_rollup pe SQL GROUP BY + window functions;
+    Python sirf final top-N rows shape karta hai.
+    """
+    if by not in TOP_APPS_GROUPS:
+        raise HTTPException(
+            status_code=400, detail=f"by must be one of: {', '.join(TOP_APPS_GROUPS)}"
+        )
+    if not 1 <= top <= TOP_APPS_MAX:
+        raise HTTPException(status_code=400, detail=f"top must be between 1 and {TOP_APPS_MAX}")
+    start, end = parse_date_range(from_date, to_date)
 
-        if title:
-            item_title = title
-        elif exe:
-            item_title = exe
-        else:
-            item_title = "Activity interval"
+    async def build():
+        groups = await adb.run(
+            query_top_apps, start, end, by, top, department, manager, employee_id
+        )
+        return {"from": start, "to": end, "by": by, "top": top, "groups": groups}, {}
+
+    return await cached_json(request, start, end, build)
+
+
+def query_top_apps(
+    conn,
+    start: str,
+    end: str,
+    by: str = "department",
+    top: int = 10,
+    department: str | None = None,
+    manager: str | None = None,
+    employee_id: str | None = None,
+) -> list[dict]:
+    where = ["r.date BETWEEN ? AND ?"]
+    params: list = [start, end]
+    if employee_id:
+        where.append("r.employee_id = ?")
+        params.append(employee_id)
+    if department:
+        where.append("r.employee_id IN (SELECT employee_id FROM employees WHERE department = ?)")
+        params.append(department)
+    if manager:
+        where.append("r.employee_id IN (SELECT employee_id FROM employees WHERE manager_name = ?)")
+        params.append(manager)
+    params.append(top)
 
-        description_parts = [
-            f"Active: {active}s",
-            f"Idle: {idle}s",
-        ]
-        if exe or title:
-            description_parts.append(f"App: {exe or '-'} | {title or '-'}")
-
-        log_item = {
-            "timestamp": ts,
-            "type": activity_type,
-            "title": item_title,
-            "description": " | ".join(description_parts),
-            "duration": f"{total_sec}s" if total_sec else None,
-            "details": f"log_id={row['id']}",
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        WITH per_employee AS (
+            -- pehle (employee, app) pe collapse, employees join sirf in rows pe
+            SELECT
+                r.employee_id,
+                r.app_id,
+                SUM(r.active_seconds) AS active_seconds,
+                SUM(r.intervals) AS intervals
+            FROM daily_app_rollup r
+            WHERE {' AND '.join(where)}
+            GROUP BY r.employee_id, r.app_id
+        ),
+        per_group AS (
+            SELECT
+                {TOP_APPS_GROUPS[by]} AS grp,
+                r.app_id,
+                MAX(e.name) AS name,
+                SUM(r.active_seconds) AS active_seconds,
+                SUM(r.intervals) AS intervals
+            FROM per_employee r
+            JOIN employees e ON e.employee_id = r.employee_id
+            GROUP BY grp, r.app_id
+        ),
+        ranked AS (
+            SELECT
+                grp, name, app_id, active_seconds, intervals,
+                ROW_NUMBER() OVER (PARTITION BY grp ORDER BY active_seconds DESC, app_id) AS rank,
+                SUM(active_seconds) OVER (PARTITION BY grp) AS group_active_seconds
+            FROM per_group
+        )
+        SELECT grp, name, app_id, active_seconds, intervals, rank, group_active_seconds
+        FROM ranked
+        WHERE rank <= ?
+        ORDER BY grp, rank
+        """,
+        params,
+    )
+    rows = cur.fetchall()
+
+    app_names = app_dictionary.names_for(cur, {row["app_id"] for row in rows})
+
+    groups: list[dict] = []
+    for row in rows:
+        if not groups or groups[-1]["group"] != row["grp"]:
+            group = {
+                "group": row["grp"],
+                "active_seconds": row["group_active_seconds"],
+                "apps": [],
+            }
+            if by == "employee":
+                group["name"] = row["name"]
+            groups.append(group)
+        total = row["group_active_seconds"] or 0
+        groups[-1]["apps"].append(
+            {
+                "rank": row["rank"],
+                "app_exe": app_names.get(row["app_id"], (None, None))[0],
+                "active_seconds": row["active_seconds"],
+                "intervals": row["intervals"],
+                "share": round(row["active_seconds"] / total, 4) if total else 0.0,
+            }
+        )
+    return groups
+
+
+# ========== GROUP ANALYTICS ==========
+
+@app.get("/analytics/groups")
+async def analytics_groups(
+    request: Request,
+    by: str = Query("department"),
+    from_date: str | None = Query(None, alias="from"),
+    to_date: str | None = Query(None, alias="to"),
+):
+    """
+    Department / location / work_mode / domain / manager wise totals +
+    headcount, taaki dashboard ko saare employees ki list na mangani pade.
+    """
+    if by not in GROUP_DIMENSIONS:
+        raise HTTPException(
+            status_code=400, detail=f"by must be one of: {', '.join(GROUP_DIMENSIONS)}"
+        )
+    start, end = parse_date_range(from_date, to_date)
+
+    async def build():
+        groups = await adb.run(query_groups, by, start, end)
+        days = (date.fromisoformat(end) - date.fromisoformat(start)).days + 1
+        return {"by": by, "from": start, "to": end, "days": days, "groups": groups}, {}
+
+    return await cached_json(request, start, end, build)
+
+
+def query_groups(conn, by: str, start: str, end: str) -> list[dict]:
+    refresh_group_rollup(conn, start, end)
+    days = (date.fromisoformat(end) - date.fromisoformat(start)).days + 1
+
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT COALESCE({GROUP_DIMENSIONS[by]}, '') AS group_value, COUNT(*) AS headcount
+        FROM employees
+        GROUP BY group_value
+        """
+    )
+    groups = {
+        row["group_value"]: {
+            "group": row["group_value"] or None,
+            "headcount": row["headcount"],
+            "active_employee_days": 0,
+            "avg_daily_active": 0.0,
+            "active_seconds": 0,
+            "idle_seconds": 0,
+            "suspicious_count": 0,
+            "intervals": 0,
         }
-        logs.append(log_item)
+        for row in cur.fetchall()
+    }
+
+    cur.execute(
+        """
+        SELECT
+            group_value,
+            SUM(active_seconds) AS active_seconds,
+            SUM(idle_seconds) AS idle_seconds,
+            SUM(suspicious_count) AS suspicious_count,
+            SUM(intervals) AS intervals,
+            SUM(employees) AS employee_days
+        FROM daily_group_rollup
+        WHERE dimension = ? AND date BETWEEN ? AND ?
+        GROUP BY group_value
+        """,
+        (by, start, end),
+    )
+    for row in cur.fetchall():
+        group = groups.setdefault(
+            row["group_value"],
+            {"group": row["group_value"] or None, "headcount": 0},
+        )
+        group.update(
+            active_employee_days=row["employee_days"],
+            avg_daily_active=round(row["employee_days"] / days, 2),
+            active_seconds=row["active_seconds"],
+            idle_seconds=row["idle_seconds"],
+            suspicious_count=row["suspicious_count"],
+            intervals=row["intervals"],
+        )
+
+    return sorted(groups.values(), key=lambda g: (-g["active_seconds"], g["group"] or ""))
+
+
+# ========== EXPORT ==========
+
+EXPORT_COLUMNS = (
+    "id", "employee_id", "name", "department", "date", "timestamp",
+    "active_seconds", "idle_seconds", "suspicious",
+    "active_app_exe", "active_app_title",
+    "keypresses", "mouse_clicks", "mouse_moves", "scrolls", "window_changes",
+)
+EXPORT_FETCH_ROWS = 1000
+
+
+def iter_export_rows(
+    from_date: str, to_date: str, department: str | None, employee_id: str | None, fmt: str
+):
+    """
+    Server-side cursor se EXPORT_FETCH_ROWS rows ek baar me -> encoded chunk.
+    Apna connection use karta hai (pool ka nahi), kyunki lamba export
+    pool connection ko minutes tak block kar deta.
+    """
+    where = ["a.date BETWEEN ? AND ?"]
+    params: list = [from_date, to_date]
+    if department:
+        where.append("e.department = ?")
+        params.append(department)
+    if employee_id:
+        where.append("a.employee_id = ?")
+        params.append(employee_id)
+
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            SELECT
+                a.id, a.employee_id, e.name, e.department, a.date, a.timestamp,
+                a.active_seconds, a.idle_seconds, a.suspicious,
+                -- apps '' store karta hai (unique key ke liye); export me unknown = null
+                -- (CSV writer None ko waise bhi '' likhta hai)
+                NULLIF(p.exe, ''), NULLIF(p.title, ''),
+                a.keypresses, a.mouse_clicks, a.mouse_moves, a.scrolls, a.window_changes
+            FROM activity_logs a
+            JOIN employees e ON e.employee_id = a.employee_id
+            LEFT JOIN apps p ON p.app_id = a.app_id
+            WHERE {' AND '.join(where)}
+            ORDER BY a.date, a.employee_id, a.timestamp
+            """,
+            params,
+        )
+
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buf.getvalue()
+
+        while True:
+            rows = cur.fetchmany(EXPORT_FETCH_ROWS)
+            if not rows:
+                break
+            if fmt == "csv":
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                writer.writerows(tuple(row) for row in rows)
+                yield buf.getvalue()
+            else:
+                yield b"".join(dump_json(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in rows)
+    finally:
+        conn.close()
+
+
+@app.get("/export/activity")
+def export_activity(
+    from_date: str | None = Query(None, alias="from"),
+    to_date: str | None = Query(None, alias="to"),
+    department: str | None = Query(None),
+    employee_id: str | None = Query(None),
+    format: str = Query("ndjson"),
+):
+    """
+    Payroll/audit export: date range ke saare raw intervals, streamed
+    (NDJSON ya CSV). Memory constant rehti hai chahe range kitni bhi badi ho.
+    """
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    start, end = parse_date_range(from_date, to_date)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"nagster_activity_{start}_{end}.{format}"
+    return StreamingResponse(
+        iter_export_rows(start, end, department, employee_id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# ========== LIVE FEED ==========
 
-    return logs
+def sse_event(event_type: str, data) -> str:
+    return f"event: {event_type}\ndata: {dump_json(data).decode('utf-8')}\n\n"
 
+
+@app.get("/live")
+async def live_feed(
+    request: Request,
+    department: str | None = Query(None),
+    manager: str | None = Query(None),
+):
+    """
+    Server-Sent Events: dashboard polling ki jagah push.
+    Events: "snapshot" (connect pe abhi Active employees), "status"
+    (Active/Inactive change), "interval" (har ingested interval + day totals),
+    "suspicious". ?department= / ?manager= se filter.
+    """
+    if len(live_hub.subscribers) >= LIVE_MAX_SUBSCRIBERS:
+        raise HTTPException(status_code=503, detail="Too many live subscribers")
+
+    sub = live_hub.subscribe(department, manager)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            active = []
+            for emp_id in live_hub.active_employees():
+                event = live_hub.status_event(emp_id, "Active")
+                if sub.wants(event):
+                    active.append(event)
+            yield sse_event("snapshot", {"active": active})
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                yield sse_event(event["type"], event)
+        finally:
+            live_hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
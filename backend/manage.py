@@ -0,0 +1,155 @@
+"""
+Nagster backend maintenance commands (backend folder se chalao):
+
+    python manage.py migrate
+    python manage.py rebuild-rollups
+    python manage.py rebuild-rollups --date 2025-01-30 --date 2025-01-31
+    python manage.py retention [--days 90] [--archive-dir archive]
+    python manage.py enable-incremental-vacuum   # ek baar, server band karke
+    python manage.py replay-dead-letter [--path ingest_dead_letter.ndjson]   # server band karke
+"""
+
+import argparse
+import json
+import os
+
+from main import (
+    ARCHIVE_DIR,
+    DB_PATH,
+    INGEST_DEAD_LETTER_PATH,
+    RETENTION_DAYS,
+    ActivityLog,
+    configure_database,
+    enable_incremental_vacuum,
+    get_connection,
+    init_db,
+    missing_employees,
+    rebuild_rollups,
+    run_retention,
+    store_activity_logs,
+)
+
+
+def cmd_migrate(args):
+    configure_database()
+    conn = get_connection()
+    init_db(conn)
+    conn.close()
+    print("✅ Schema up to date:", os.path.abspath(DB_PATH))
+
+
+def cmd_rebuild_rollups(args):
+    configure_database()
+    conn = get_connection()
+    init_db(conn)
+    rebuilt = rebuild_rollups(conn, args.date or None)
+    conn.close()
+    print(f"✅ Rollups rebuilt from activity_logs for {len(rebuilt)} dates")
+
+
+def cmd_retention(args):
+    configure_database()
+    conn = get_connection()
+    init_db(conn)
+    result = run_retention(conn, args.days, args.archive_dir)
+    conn.close()
+    print(
+        f"✅ Archived {result['rows_archived']} rows from {result['dates']} dates "
+        f"older than {result['cutoff']} into {args.archive_dir}"
+    )
+    if result["dates"] and result["pages_freed"] is None:
+        print("⚠️  DB auto_vacuum=INCREMENTAL nahi hai, free pages file me reh gaye; "
+              "`python manage.py enable-incremental-vacuum` chalao")
+
+
+def cmd_enable_incremental_vacuum(args):
+    configure_database()
+    conn = get_connection()
+    size_before = os.path.getsize(DB_PATH)
+    print("⏳ auto_vacuum check + zarurat ho to full VACUUM (DB locked rahega, server band hona chahiye) ...")
+    converted = enable_incremental_vacuum(conn)
+    conn.close()
+    if converted:
+        print(f"✅ auto_vacuum=INCREMENTAL: {size_before / 1e6:.1f} MB -> {os.path.getsize(DB_PATH) / 1e6:.1f} MB")
+    else:
+        print("✅ Already auto_vacuum=INCREMENTAL, kuch nahi kiya")
+
+
+def cmd_replay_dead_letter(args):
+    """
+    Ingest queue ki dead-letter rows dobara store karo. Jo ab bhi fail hon
+    (unknown employee, constraint) wo file me reh jaati hain. Server band
+    hona chahiye: uska response cache in rows ki dates ko nahi jaanta.
+    """
+    if not os.path.exists(args.path):
+        print("✅ Dead-letter file nahi hai, kuch replay nahi karna:", args.path)
+        return
+
+    configure_database()
+    conn = get_connection()
+    init_db(conn)
+
+    with open(args.path, encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+
+    stored = 0
+    kept = []
+    for line in lines:
+        entry = json.loads(line)
+        try:
+            log = ActivityLog.model_validate(entry["log"])
+            if missing_employees(conn, {log.employee_id}):
+                raise ValueError(f"employee {log.employee_id} not registered")
+            store_activity_logs(conn, [log])
+            stored += 1
+        except Exception as e:
+            conn.rollback()
+            entry["error"] = repr(e)
+            kept.append(json.dumps(entry) + "\n")
+    conn.close()
+
+    if kept:
+        tmp_path = args.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+        os.replace(tmp_path, args.path)
+    else:
+        os.remove(args.path)
+
+    print(f"✅ Replayed {stored} dead-letter rows")
+    if kept:
+        print(f"⚠️  {len(kept)} rows phir fail hui, {args.path} me chhod di (error field dekho)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nagster backend maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("migrate", help="apply pending schema migrations")
+    p.set_defaults(func=cmd_migrate)
+
+    p = sub.add_parser("rebuild-rollups", help="recompute rollup tables from raw activity_logs")
+    p.add_argument("--date", action="append", help="YYYY-MM-DD (repeatable); default: all dates")
+    p.set_defaults(func=cmd_rebuild_rollups)
+
+    p = sub.add_parser("retention", help="archive + delete raw logs older than the retention window")
+    p.add_argument("--days", type=int, default=RETENTION_DAYS, help=f"raw days to keep (default {RETENTION_DAYS})")
+    p.add_argument("--archive-dir", default=ARCHIVE_DIR, help=f"monthly zip archives (default {ARCHIVE_DIR})")
+    p.set_defaults(func=cmd_retention)
+
+    p = sub.add_parser(
+        "enable-incremental-vacuum",
+        help="one-time full VACUUM to switch an existing DB to auto_vacuum=INCREMENTAL (stop the server first)",
+    )
+    p.set_defaults(func=cmd_enable_incremental_vacuum)
+
+    p = sub.add_parser("replay-dead-letter", help="re-insert ingest rows the write-behind queue could not store")
+    p.add_argument("--path", default=INGEST_DEAD_LETTER_PATH, help=f"dead-letter NDJSON (default {INGEST_DEAD_LETTER_PATH})")
+    p.set_defaults(func=cmd_replay_dead_letter)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Prometheus text-format metrics, bina kisi external library ke.
+
+Hot path (counter inc / histogram observe) pe koi lock nahi: har thread
+apne shard (plain dict) me likhta hai, sirf wahi thread us shard ko
+mutate karta hai. Scrape ke waqt saare shards jodte hain. Pehli baar koi
+thread metric likhe tab ek baar lock lagta hai (shard register karne ke liye).
+
+    from metrics import registry
+    REQUESTS = registry.counter("nagster_x_total", "help", ("route",))
+    REQUESTS.inc(("/overview",))
+    LATENCY = registry.histogram("nagster_x_seconds", "help", ("route",))
+    LATENCY.observe(("/overview",), 0.012)
+    registry.gauge("nagster_y", "help", lambda: [((), 42)])
+    text = registry.render()
+"""
+
+import bisect
+import threading
+import time
+
+# seconds; SQLite queries aur HTTP dono ke liye theek
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Shards(threading.local):
+    """Per-thread storage: metric name -> {label values: value}."""
+
+    def __init__(self, registry: "MetricsRegistry"):
+        self.data: dict[str, dict] = {}
+        with registry._lock:
+            registry._shards.append(self.data)
+
+
+class Counter:
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, labelnames: tuple):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        series = self.registry._local_series(self.name)
+        series[labels] = series.get(labels, 0) + amount
+
+    def collect(self) -> dict:
+        totals: dict = {}
+        for series in self.registry._all_series(self.name):
+            for labels, value in list(series.items()):
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self, registry: "MetricsRegistry", name: str, help_text: str, labelnames: tuple, buckets: tuple
+    ):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels: tuple, value: float):
+        series = self.registry._local_series(self.name)
+        state = series.get(labels)
+        if state is None:
+            # [per-bucket counts..., +Inf count, sum]
+            state = series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def collect(self) -> dict:
+        totals: dict = {}
+        for series in self.registry._all_series(self.name):
+            for labels, state in list(series.items()):
+                agg = totals.get(labels)
+                if agg is None:
+                    totals[labels] = list(state)
+                else:
+                    for i, v in enumerate(state):
+                        agg[i] += v
+        return totals
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, state in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = 'le="' + _fmt(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(state[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Scrape ke waqt callback se value (pool size, queue depth, file size ...)."""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple, callback, kind: str = "gauge"):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.callback = callback
+        self.kind = kind
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.callback():
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._shards: list[dict] = []
+        self._local = _Shards(self)
+        self._metrics: list = []
+
+    def _local_series(self, name: str) -> dict:
+        data = self._local.data  # is thread ka shard (pehli access pe register)
+        series = data.get(name)
+        if series is None:
+            series = data[name] = {}
+        return series
+
+    def _all_series(self, name: str):
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            series = shard.get(name)
+            if series:
+                yield series
+
+    def counter(self, name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+        metric = Counter(self, name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS
+    ) -> Histogram:
+        metric = Histogram(self, name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str, callback, labelnames: tuple = (), kind: str = "gauge") -> Gauge:
+        """callback() -> [(label values tuple, value), ...]"""
+        metric = Gauge(name, help_text, labelnames, callback, kind)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "nagster_http_request_duration_seconds",
+    "Time until response headers are sent, by route template.",
+    ("method", "route", "status"),
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (BaseHTTPMiddleware streaming responses buffer
+    kar deta hai). Latency = response start tak; /live jaise streams ke liye
+    bhi matlab ka number deta hai. Route label = path template, taaki
+    /activity/EMP001 jaisi har ID alag series na bane.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        observed = False
+
+        def observe(status):
+            nonlocal observed
+            observed = True
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                (scope["method"], getattr(route, "path", "unmatched"), str(status)),
+                time.perf_counter() - start,
+            )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not observed:
+                observe(500)
@@ -0,0 +1,284 @@
+"""
+Agent hot paths ka micro-benchmark: NagsterAgent.on_key / on_mouse_move /
+on_mouse_click / on_mouse_scroll / tick_second / build_payload ko synthetic
+events se seedha call karta hai (pynput / win32 ki zarurat nahi).
+
+    python benchmarks/bench_agent_hotpaths.py                  # baseline se compare
+    python benchmarks/bench_agent_hotpaths.py --save-baseline  # naya baseline likho
+
+Har case ke liye:
+  ns/event       - --repeat runs ka median, --events calls each
+  alloc B/event  - tracemalloc: call ke dauraan peak allocation (transient)
+  kept B/event   - tracemalloc: call ke baad bachi memory (net growth)
+  lock hold      - agent.lock kitni der pakda gaya (mean / max, ns)
+
+Agent ka clock simulated hai (realistic gaps: key 150ms, mouse move 10ms,
+...) taaki 60s key window jaisi time-based state real typing jitni bade,
+benchmark ki speed jitni nahi. Baseline machine-specific hai; CI me same
+runner pe compare karo. Regression (> --tolerance) pe exit code 1.
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agent_hotpaths_baseline.json")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import agent_core  # noqa: E402
+
+
+class SimClock:
+    """agent_core.time ki jagah: time() simulated, baaki real time module."""
+
+    def __init__(self, start: float):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class SyntheticKey:
+    """pynput KeyCode / Key jaisa str(): "'a'" ya "Key.space"."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+
+class TimedLock:
+    """agent.lock ka drop-in: har acquire->release ki hold time record karta hai."""
+
+    def __init__(self):
+        self._lock = agent_core.threading.Lock()
+        self.holds_ns: list[int] = []
+        self._since = 0
+
+    def __enter__(self):
+        self._lock.acquire()
+        self._since = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.holds_ns.append(time.perf_counter_ns() - self._since)
+        self._lock.release()
+
+
+WINDOWS = [
+    ("chrome.exe", "Jira - Sprint board - Google Chrome", 101),
+    ("Code.exe", "agent_core.py - Nagster - Visual Studio Code", 102),
+    ("slack.exe", "Slack | #engineering", 103),
+    ("EXCEL.EXE", "Q3 report.xlsx - Excel", 104),
+]
+KEYS = [SyntheticKey(f"'{c}'") for c in "the quick brown fox jumps over lazy dog"] + [
+    SyntheticKey("Key.space"), SyntheticKey("Key.enter"), SyntheticKey("Key.shift"), SyntheticKey("Key.backspace"),
+]
+
+
+class BenchAgent(agent_core.NagsterAgent):
+    """Win32 ki jagah har 20 ticks pe agla synthetic window."""
+
+    def __init__(self):
+        super().__init__("BENCH00000", {"backend_base_url": "http://127.0.0.1:9"})
+        self._ticks = 0
+
+    def get_active_window(self):
+        self._ticks += 1
+        return WINDOWS[(self._ticks // 20) % len(WINDOWS)]
+
+
+def feed_interval(agent: BenchAgent, clock: SimClock, i: int):
+    """build_payload se pehle ek realistic 8-second interval ka input."""
+    for n in range(8):
+        agent.tick_second()
+        clock.advance(1)
+        for k in range(5):
+            agent.on_key(KEYS[(i * 7 + n * 5 + k) % len(KEYS)])
+        for m in range(30):
+            agent.on_mouse_move(400 + m, 300 + n)
+        if n % 3 == 0:
+            agent.on_mouse_click(410, 310, "Button.left", True)
+        if n % 2 == 0:
+            agent.on_mouse_scroll(410, 310, 0, -1)
+
+
+# case -> (call(agent, i), simulated seconds per event, needs feed_interval)
+CASES = {
+    "on_key": (lambda a, i: a.on_key(KEYS[i % len(KEYS)]), 0.15, False),
+    "on_mouse_move": (lambda a, i: a.on_mouse_move(i % 1920, i % 1080), 0.01, False),
+    "on_mouse_click": (lambda a, i: a.on_mouse_click(500, 400, "Button.left", i % 2 == 0), 1.0, False),
+    "on_mouse_scroll": (lambda a, i: a.on_mouse_scroll(500, 400, 0, -1 if i % 3 else 1), 0.1, False),
+    "tick_second": (lambda a, i: a.tick_second(), 1.0, False),
+    "build_payload": (lambda a, i: a.build_payload(), 0.0, True),
+}
+
+
+def new_agent() -> tuple[BenchAgent, SimClock]:
+    clock = SimClock(1_700_000_000.0)
+    agent_core.time = clock
+    agent = BenchAgent()
+    # synthetic input kabhi logout trigger na kare
+    agent.trigger_logout = lambda reason: None
+    return agent, clock
+
+
+def warm(agent, clock, call, gap, feed, events: int):
+    for i in range(events):
+        if feed:
+            feed_interval(agent, clock, i)
+        call(agent, i)
+        clock.advance(gap)
+
+
+def time_case(name: str, events: int, repeat: int) -> float:
+    call, gap, feed = CASES[name]
+    runs = []
+    for _ in range(repeat):
+        agent, clock = new_agent()
+        warm(agent, clock, call, gap, feed, min(events, 200))
+        total = 0
+        gc.collect()
+        gc.disable()  # timeit jaisa: GC pauses timing me noise na daalein
+        try:
+            for i in range(events):
+                if feed:
+                    feed_interval(agent, clock, i)
+                start = time.perf_counter_ns()
+                call(agent, i)
+                total += time.perf_counter_ns() - start
+                clock.advance(gap)
+        finally:
+            gc.enable()
+        runs.append(total / events)
+    return statistics.median(runs)
+
+
+def alloc_case(name: str, events: int) -> tuple[float, float]:
+    call, gap, feed = CASES[name]
+    agent, clock = new_agent()
+    warm(agent, clock, call, gap, feed, min(events, 200))
+    peaks = 0
+    kept = 0
+    tracemalloc.start()
+    try:
+        for i in range(events):
+            if feed:
+                feed_interval(agent, clock, i)
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            call(agent, i)
+            after, peak = tracemalloc.get_traced_memory()
+            peaks += peak - before
+            kept += after - before
+            clock.advance(gap)
+    finally:
+        tracemalloc.stop()
+    return peaks / events, kept / events
+
+
+def lock_case(name: str, events: int) -> tuple[float, int]:
+    call, gap, feed = CASES[name]
+    agent, clock = new_agent()
+    warm(agent, clock, call, gap, feed, min(events, 200))
+    timed = TimedLock()
+    agent.lock = timed
+    for i in range(events):
+        if feed:
+            agent.lock = agent_core.threading.Lock()
+            feed_interval(agent, clock, i)
+            agent.lock = timed
+        call(agent, i)
+        clock.advance(gap)
+    holds = timed.holds_ns
+    return statistics.mean(holds), max(holds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000, help="calls per case (build_payload: /20)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed ns/event slowdown vs baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--case", action="append", choices=list(CASES), help="sirf ye case(s)")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    for name in args.case or CASES:
+        events = args.events // 20 if CASES[name][2] else args.events
+        ns = time_case(name, events, args.repeat)
+        alloc, kept = alloc_case(name, min(events, 5000))
+        hold_mean, hold_max = lock_case(name, events)
+        results[name] = {
+            "ns_per_event": round(ns, 1),
+            "alloc_bytes_per_event": round(alloc, 1),
+            "kept_bytes_per_event": round(kept, 1),
+            "lock_hold_mean_ns": round(hold_mean, 1),
+            "lock_hold_max_ns": hold_max,
+        }
+
+    header = f"{'case':<16} {'ns/event':>10} {'vs base':>8} {'alloc B/ev':>11} {'kept B/ev':>10} {'lock mean ns':>13} {'lock max ns':>12}"
+    print(header)
+    print("-" * len(header))
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name, {}).get("ns_per_event")
+        delta = "-"
+        if base:
+            change = r["ns_per_event"] / base - 1
+            delta = f"{change:+.0%}"
+            if change > args.tolerance:
+                regressions.append(f"{name}: {base:.0f} -> {r['ns_per_event']:.0f} ns/event ({delta})")
+        print(
+            f"{name:<16} {r['ns_per_event']:>10.0f} {delta:>8} {r['alloc_bytes_per_event']:>11.0f} "
+            f"{r['kept_bytes_per_event']:>10.0f} {r['lock_hold_mean_ns']:>13.0f} {r['lock_hold_max_ns']:>12}"
+        )
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "python": sys.version.split()[0],
+                    "platform": sys.platform,
+                    "events": args.events,
+                    "repeat": args.repeat,
+                    "ns_per_event": "median of repeats",
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+            f.write("\n")
+        print("\nBaseline saved:", os.path.relpath(args.baseline, ROOT))
+    elif regressions:
+        print(f"\nRegressions (> {args.tolerance:.0%} slower than baseline):")
+        for line in regressions:
+            print("  " + line)
+        sys.exit(1)
+    elif not baseline:
+        print("\nNo baseline yet; run with --save-baseline.")
+
+
+if __name__ == "__main__":
+    main()